@@ -1,4 +1,3 @@
-import pygame
 from  pygame.sprite import Sprite
 
 class Alien(Sprite):
@@ -10,23 +9,30 @@ class Alien(Sprite):
         self.screen = ai_game.screen
         self.settings = ai_game.settings
 
-        # Load the alien image and set its rect attribute.
-        self.image = pygame.image.load(r"images\alien.bmp")
+        # Use the shared alien image and set its rect attribute.
+        self.image = ai_game.assets.image('alien')
         self.rect = self.image.get_rect()
 
         # Start each new alien near the top left of the screen.
-        self.rect.x = self.rect.width
-        self.rect.y = self.rect.height
+        self.reset(self.rect.width, self.rect.height)
+
+    def reset(self, x_position, y_position):
+        """Place the alien, ready to join a fleet."""
+        self.rect.x = x_position
+        self.rect.y = y_position
 
         # Store the alien's exact horizontal position.
-        self.x = float(self.rect.x)
+        self.x = float(x_position)
+
+        # Slot in the NumPy fleet arrays, if the game uses them.
+        self.fleet_index = None
 
     def check_edges(self):
         """Return True if alien is at edge of screen."""
-        screen_rect = self.screen.get_rect()
-        return (self.rect.right >= screen_rect.right) or (self.rect.left <= 0)
+        return (self.rect.right >= self.settings.screen_width) or (self.rect.left <= 0)
         
-    def update(self):
-        """Move the alien to the right or left."""
-        self.x += self.settings.alien_speed * self.settings.fleet_direction
+    def update(self, dt):
+        """Move the alien to the right or left for dt seconds."""
+        self.x += (self.settings.alien_speed * self.settings.wave_speed
+                   * self.settings.fleet_direction * dt)
         self.rect.x = self.x
\ No newline at end of file
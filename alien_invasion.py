@@ -1,60 +1,107 @@
+import os
 import sys
-from time import sleep
+from argparse import ArgumentParser
+from random import randrange
+from time import perf_counter, strftime
 
 import pygame
 
-from random import randint, uniform
 from settings import Settings
-from game_stats import GameStats
+from display import GameDisplay
+from assets import AssetRegistry, asset_path
+from audio import AudioManager
+from loading_screen import LoadingScreen
+from game_core import GameCore, TickInput
 from scoreboard import Scoreboard
-from button import Button   
-from ship import Ship
-from bullet import Bullet
-from alien import Alien
+from button import Button
 from explosion import Explosion
+from animation import AnimationAtlas
+from replay import InputRecorder
+from score_store import ScoreStore
+from spectator import SpectatorServer
+from save_state import RewindBuffer, capture, restore
+from profiler import FrameProfiler, ProfilerOverlay
+from input_handler import InputHandler
+from governor import QualityGovernor
+from renderer import FullRenderer, DirtyRenderer, FleetRenderer
+from pool import SpritePool
 
 class AlienInvasion:
     """Overall class to manage game assets and behavior."""
 
-    def __init__(self):
+    def __init__(self, settings=None):
         """Initialize the game, and create game resources."""
+        # Milliseconds from here to the first frame and to the first
+        # playable frame, for startup_report().
+        self.startup_start = perf_counter()
+        self.startup_times = {}
+
         pygame.init()
-        self.settings = Settings()
+        self.settings = settings if settings is not None else Settings()
 
-        self.screen = pygame.display.set_mode((
-            self.settings.screen_width, self.settings.screen_height), pygame.DOUBLEBUF)
+        # The game draws at a fixed size; the display scales it to the window.
+        self.display = GameDisplay(self.settings)
+        self.screen = self.display.surface
         pygame.display.set_caption("Alien Invasion")
+        self.clock = pygame.time.Clock()
+
+        # Load every image and sound once, in the background behind a
+        # loading screen; sprites share them by key.
+        self.assets = AssetRegistry()
+        self._load_assets()
+
+        # The game rules live in the core; this class shows them in a window.
+        self.core = GameCore(self.settings, self.screen, self.assets)
+        self.stats = self.core.stats
+        self.ship = self.core.ship
+        self.bullets = self.core.bullets
+        self.aliens = self.core.aliens
+
+        # Every finished game is saved to the score store, off the main thread.
+        self.scores = ScoreStore(self.settings.score_path)
+        self.stats.high_score = max(self.stats.high_score, self.scores.high_score())
 
-        # Create an instance to store game statistics.
-        self.stats = GameStats(self)
         self.sb = Scoreboard(self)
+        self._load_leaderboard()
 
-        self.ship = Ship(self)
-        self.bullets = pygame.sprite.Group()
-        self.aliens = pygame.sprite.Group()
+        # Explosion frames are cut once and shared by every explosion.
+        self.explosion_atlas = AnimationAtlas(self.assets.image('explosion_sheet'), 5)
         self.explosions = pygame.sprite.Group()
+        self.explosion_pool = SpritePool(
+            lambda: Explosion(self), self.settings.explosion_pool_size)
 
-        self._create_fleet()
+        # Held keys are sampled into a TickInput for the core every tick.
+        self.input_handler = InputHandler(self.settings)
+        self.input_handler.restrict_events()
+        self.inputs = TickInput()
 
-        # Load and play background music
-        pygame.mixer.music.load('sounds/background_music.mp3')
-        pygame.mixer.music.set_volume(0.5)  # Set background music volume to 50%
-        pygame.mixer.music.play(-1)  # -1 means the music will loop indefinitely
+        # Records the current game when Settings.record_dir is set.
+        self.recorder = None
 
-        # Load explosion sound
-        self.explosion_sound = pygame.mixer.Sound('sounds/explosion.wav')
+        # Recent states for rewinding while R is held; F5 and F9 save
+        # and load a state.
+        self.rewind_buffer = RewindBuffer(self.settings.rewind_budget)
+        self.rewinding = False
 
-        # Load explosion sprite sheet
-        self.explosion_sheet = pygame.image.load('images/explosion_sheet.png')
+        # Streams every tick to spectators when Settings.spectator_port is set.
+        self.spectator_server = None
+        if self.settings.spectator_port is not None:
+            self.spectator_server = SpectatorServer(self.settings, self.settings.spectator_port)
 
-        # Extract explosion frames from the sprite sheet
-        self.explosion_frames = self._get_explosion_frames()
+        # Sound effects and music; the music starts once the menu is up,
+        # see run_game().
+        self.audio = AudioManager(self.assets)
+        self.music_started = False
 
-        # Load heart image
-        self.heart_image = pygame.image.load('images/heart.bmp')
+        # Frame times while a lost ship explodes, to check the sequence
+        # never stalls the loop.
+        self.hit_frame_times = []
+        self.last_hit_sequence = None
+
+        # Shared heart image
+        self.heart_image = self.assets.image('heart')
 
         # Start Alien Invasion in an inactive state.
-        self.game_active = False
         self.show_difficulty_buttons = False
 
         # Make the play button.
@@ -68,288 +115,478 @@ class AlienInvasion:
         # Create back button
         self.back_button = Button(self, 'Back', 10, 10)
 
-        self.clock = pygame.time.Clock()
+        # What a click on each menu button does, checked in this order.
+        self.menu_buttons = [
+            (self.play_button, self.start_game),
+            (self.easy_button, lambda: self._start_difficulty('easy')),
+            (self.medium_button, lambda: self._start_difficulty('medium')),
+            (self.hard_button, lambda: self._start_difficulty('hard')),
+            (self.back_button, self._back_to_main_screen),
+        ]
+
+        # Pick how frames reach the display.
+        if self.settings.render_mode == 'dirty':
+            self.renderer = DirtyRenderer(self.display, self.settings.bg_color)
+        else:
+            self.renderer = FullRenderer(self.display, self.settings.bg_color)
+        self.drawn_active = None
+        self.fleet_renderer = FleetRenderer(
+            self.core, self.screen, cache=self.settings.fleet_render_mode == 'composite')
+
+        # Drops quality tiers while frames run over budget; the HUD is
+        # redrawn when it's stale and the tier allows.
+        self.governor = QualityGovernor(self.settings)
+        self.hud_stale = False
+
+        # Per-phase frame timing, switched on with F3.
+        self.profiler = FrameProfiler()
+        self.profiler_overlay = ProfilerOverlay(
+            self, self.profiler, ('events', 'tick', 'ship', 'bullets', 'aliens',
+                                  'explosions', 'screen'))
+
+    @property
+    def game_active(self):
+        """Return True while a game is being played."""
+        return self.core.game_active
+
+    def _load_assets(self):
+        """Load images and sounds on a background thread, showing progress."""
+        loading_screen = LoadingScreen(self)
+        self.assets.start_loading()
+        while True:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    pygame.quit()
+                    sys.exit()
+
+            loading_screen.draw(self.assets.progress())
+            self.display.flip()
+            self._mark_startup('first_frame_ms')
+
+            if self.assets.loading_done():
+                break
+            self.clock.tick(self.settings.frame_rate)
+
+        # Converting images for the display has to happen on this thread.
+        self.assets.finish_loading()
+
+    def _mark_startup(self, name):
+        """Record the time since startup began, the first time name happens."""
+        if name not in self.startup_times:
+            self.startup_times[name] = (perf_counter() - self.startup_start) * 1000
+
+    def _start_music(self):
+        """Start streaming the background music."""
+        self.audio.play_music('background', 0.5)
+        self.music_started = True
+        self._mark_startup('music_ms')
+
+    def startup_report(self):
+        """Return the startup times, and how long loading the assets took."""
+        report = dict(self.startup_times)
+        report['asset_load_ms'] = self.assets.stats()['load_time_ms']
+        return report
 
     def run_game(self):
         """Start the main loop for the game."""
+        # Show the menu first, so loading the music doesn't delay it.
+        self._update_screen()
+        if not self.music_started:
+            self._start_music()
+        if self.settings.startup_report:
+            print(", ".join(f"{name} {ms:.1f}" for name, ms in self.startup_report().items()))
+
+        tick_time = 1 / self.settings.tick_rate
+        lag = 0.0
         while True:
-            self._check_events()
-
-            if self.game_active:
-                self.ship.update()
-                self._update_bullets()
-                self._update_aliens()
-                self._update_explosions()
-
-            self._update_screen()
-            self.clock.tick(60)
+            lag += self.clock.tick(self.settings.frame_rate) / 1000
+            frame_start = perf_counter()
+            self._run_phase('events', self._check_events)
+
+            # Run as many fixed ticks as the time since the last frame covers.
+            steps = 0
+            while lag >= tick_time and steps < self.settings.max_catchup_steps:
+                if self.game_active:
+                    self.inputs = self.input_handler.tick_input()
+                    self._run_phase('tick', self._run_tick)
+                lag -= tick_time
+                steps += 1
+
+            # Too far behind to catch up; drop the rest rather than spiral.
+            if lag >= tick_time:
+                lag = 0.0
+
+            # Explosions are drawn on the menu too, so the last lost
+            # ship's explosion has to keep playing after the game ends.
+            self._run_phase('explosions', self._update_explosions)
+
+            self._run_phase('screen', self._update_screen, lag / tick_time)
+            if self.profiler.enabled:
+                self.profiler.end_frame(frame_start)
+            frame_ms = (perf_counter() - frame_start) * 1000
+            self._track_hit_sequence(frame_ms)
+            if self.governor.end_frame(frame_ms):
+                self._apply_quality()
+
+    def _apply_quality(self):
+        """Set explosion sounds and fleet drawing to the governor's tier."""
+        quality = self.governor.quality
+        self.audio.set_voice_limit('explosion', quality['explosion_voices'])
+        self.fleet_renderer.refresh_every = quality['fleet_every']
+
+    def _run_phase(self, phase, method, *args):
+        """Run one phase of the frame, timing it while the profiler is on."""
+        if not self.profiler.enabled:
+            return method(*args)
+        start = self.profiler.start()
+        result = method(*args)
+        self.profiler.stop(phase, start)
+        return result
+
+    def _run_tick(self):
+        """Step the core once with the current input, or rewind one tick."""
+        if self.rewinding:
+            state = self.rewind_buffer.pop()
+            if state is not None:
+                self._restore_state(state)
+            return
+
+        events = self.core.step(self.inputs)
+        if self.settings.rewind_budget:
+            self.rewind_buffer.record(self.core, self._explosion_states())
+        if self.recorder is not None:
+            self.recorder.record(self.inputs)
+        if self.spectator_server is not None:
+            self.spectator_server.broadcast(self.core, self._ship_visible())
+        self._handle_core_events(events)
+
+    def _handle_core_events(self, events):
+        """Show the sounds and animations for what happened in a tick."""
+        for event in events:
+            if event[0] == 'aliens_destroyed':
+                self.hud_stale = True
+                self.audio.play('explosion')
+                for position in event[1][:self.governor.quality['explosions_per_volley']]:
+                    self._show_explosion(position)
+            elif event[0] == 'level_up':
+                self.sb.prep_level()
+            elif event[0] == 'ship_hit':
+                self._show_ship_hit(event[1])
+                self.hit_frame_times = []
+            elif event[0] == 'game_over':
+                self._save_recording()
+                self._record_game()
+                pygame.mouse.set_visible(True)
 
     def _check_events(self):
         """Respond to key presses and mouse events."""
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                self.stats._write_high_score()  # Write high score to file
-                pygame.quit()
-                sys.exit()
+                self._quit()
             elif event.type == pygame.KEYDOWN:
                 self._check_keydown_events(event)
             elif event.type == pygame.KEYUP:
                 self._check_keyup_events(event)
             elif event.type == pygame.MOUSEBUTTONDOWN:
-                mouse_pos = pygame.mouse.get_pos()
-                self._check_play_button(mouse_pos)
-                self._check_difficulty_buttons(mouse_pos)
-                self._check_back_button(mouse_pos)
+                self._check_buttons(self.display.to_game(event.pos))
+            elif event.type == pygame.WINDOWFOCUSLOST:
+                # Keys released while the window is away never send KEYUP.
+                self.input_handler.release_all()
+                self.rewinding = False
+            elif event.type in (pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED):
+                # Without a compositor, an uncovered window has lost its
+                # pixels, so the dirty renderer has to redraw everything.
+                self.renderer.invalidate()
+
+    def _quit(self):
+        """Save the game in progress, its replay and any trace, then exit."""
+        self._save_recording()
+        if self.game_active:
+            self._record_game()
+        if self.profiler.tracing:
+            self.profiler.export_trace(asset_path(self.settings.trace_path))
+        # Waits for the score store to finish writing.
+        self.scores.close()
+        if self.spectator_server is not None:
+            self.spectator_server.close()
+        self.audio.stop()
+        pygame.quit()
+        sys.exit()
+
+    def _record_game(self):
+        """Queue the game that just ended for the score store, and show it on the menu."""
+        game = (self.stats.score, self.stats.level, self.settings.difficulty,
+                self.core.ticks / self.settings.tick_rate)
+        self.scores.record_game(*game)
+
+        # The store saves it in the background, so add it to the shown
+        # leaderboard here rather than reading it back.
+        self.leaderboard.append((game[0], game[1], game[3], None))
+        self.leaderboard.sort(key=lambda row: row[0], reverse=True)
+        del self.leaderboard[self.settings.leaderboard_size:]
+        self.sb.prep_leaderboard(self.settings.difficulty, self.leaderboard)
+
+    def _load_leaderboard(self):
+        """Read the best games of the current difficulty from the score store."""
+        self.leaderboard = self.scores.leaderboard(
+            self.settings.difficulty, self.settings.leaderboard_size)
+        self.sb.prep_leaderboard(self.settings.difficulty, self.leaderboard)
+
+    def _explosion_states(self):
+        """Return the explosions as (x, y, frame_time, elapsed) tuples for a save state."""
+        now = pygame.time.get_ticks()
+        return [(explosion.rect.centerx, explosion.rect.centery, explosion.frame_time or 0,
+                 now - explosion.start_time) for explosion in self.explosions.sprites()]
+
+    def _restore_state(self, state):
+        """Put the game back in a saved state."""
+        explosions = restore(self.core, state)
+
+        now = pygame.time.get_ticks()
+        self.explosion_pool.release_all(self.explosions)
+        for x, y, frame_time, elapsed in explosions:
+            self.explosions.add(self.explosion_pool.acquire(
+                (x, y), frame_time or None, now - elapsed))
+
+        # A replay can't follow a game that went back in time.
+        self.recorder = None
+        self.sb.prep_score()
+        self.sb.prep_high_score()
+        self.sb.prep_level()
+
+    def _save_state(self):
+        """Write the current game to Settings.save_state_path."""
+        with open(asset_path(self.settings.save_state_path), 'wb') as file:
+            file.write(capture(self.core, self._explosion_states()))
+
+    def _load_state(self):
+        """Carry on from the game saved at Settings.save_state_path."""
+        try:
+            with open(asset_path(self.settings.save_state_path), 'rb') as file:
+                state = file.read()
+        except FileNotFoundError:
+            return
+        self.rewind_buffer.clear()
+        self._restore_state(state)
+        pygame.mouse.set_visible(not self.game_active)
 
     def _check_keydown_events(self, event):
         """Respond to key presses."""
-        if event.key == pygame.K_RIGHT or event.key == pygame.K_d:
-            self.ship.moving_right = True
-        elif event.key == pygame.K_LEFT or event.key == pygame.K_a:
-            self.ship.moving_left = True
-        elif event.key == pygame.K_q:
-            sys.exit()
-        elif event.key == pygame.K_SPACE or event.key == pygame.K_UP:
-            self._fire_bullet()
+        if self.input_handler.key_down(event.key, self.game_active):
+            return
+        if event.key == pygame.K_q:
+            self._quit()
         elif event.key == pygame.K_p and not self.game_active:
             self.start_game()
+        elif event.key == pygame.K_F3:
+            self._toggle_profiler()
+        elif event.key == pygame.K_F4:
+            self._toggle_trace()
+        elif event.key == pygame.K_r:
+            self.rewinding = True
+        elif event.key == pygame.K_F5 and self.game_active:
+            self._save_state()
+        elif event.key == pygame.K_F9:
+            self._load_state()
+        elif event.key == pygame.K_F11:
+            self._toggle_fullscreen()
+
+    def _toggle_fullscreen(self):
+        """Switch between a window and fullscreen, and redraw everything."""
+        self.display.toggle_fullscreen()
+        self.renderer.invalidate()
 
     def _check_keyup_events(self, event):
         """Respond to key releases."""
-        if event.key == pygame.K_RIGHT or event.key == pygame.K_d:
-            self.ship.moving_right = False
-        elif event.key == pygame.K_LEFT or event.key == pygame.K_a:
-            self.ship.moving_left = False
-
-    def _fire_bullet(self):
-        """Create a new bullet and add it to the bullets group."""
-        if len(self.bullets) < self.settings.bullets_allowed:
-            new_bullet = Bullet(self)
-            self.bullets.add(new_bullet)
-
-    def _update_bullets(self):
-        """Update the position of bullets and get rid of old bullets."""
-        # Update bullet positons.
-        self.bullets.update()
-
-        # Get rid of bullets that have disappeared.
-        for bullet in self.bullets.copy():
-            if bullet.rect.bottom <= 0:
-                self.bullets.remove(bullet)
-        
-        self._check_bullet_alien_collisions()
-
-    def _check_bullet_alien_collisions(self):
-        """Respond to bullet-alien collisions."""
-        # Remove any bullets and aliens that have collided.
-        collisions = pygame.sprite.groupcollide(self.bullets, self.aliens, True, True)
-
-        if collisions:
-            for aliens in collisions.values():
-                self.stats.score += self.settings.alien_points * len(aliens)
-            self.sb.prep_score()
-            self.sb.check_high_score()  # Update high score if necessary
-            self._show_explosion(aliens[0])
-
-        if not self.aliens:
-            # Destroy existing bullets and create new fleet.
-            self.bullets.empty()
-            self._create_fleet()
-            self.settings.increase_speed()
-
-            # Increase level.
-            self.stats.level += 1
-            self.sb.prep_level()
-
-    def _show_explosion(self, alien):
-        """Show an explosion at the alien's position."""
-        explosion = Explosion(self, alien.rect.center)
+        if self.input_handler.key_up(event.key, self.game_active):
+            return
+        if event.key == pygame.K_r:
+            self.rewinding = False
+
+    def _show_explosion(self, position):
+        """Show an explosion at the given position."""
+        explosion = self.explosion_pool.acquire(position)
         self.explosions.add(explosion)
 
     def _update_explosions(self):
-        """Update the position of explosions."""
-        self.explosions.update()
+        """Update explosions and return finished ones to the pool."""
+        if not self.governor.due('explosion_every'):
+            return
+        now = pygame.time.get_ticks()
+        finished = []
+        for explosion in self.explosions.spritedict:
+            explosion.update(now)
+            if explosion.finished:
+                finished.append(explosion)
+        for explosion in finished:
+            self.explosion_pool.release(explosion)
+
+    def _update_screen(self, alpha=1.0):
+        """
+        Update images on screen, and send the changes to the display.
+        alpha is how far between the last two ticks to draw moving things.
+        """
+        # Switching between the menu and the game redraws everything.
+        if self.drawn_active != self.game_active:
+            self.renderer.invalidate()
+            self.drawn_active = self.game_active
 
-    def _update_screen(self):
-        """Update images on screen, and flip to the new screen."""
-        self.screen.fill(self.settings.bg_color)
+        renderer = self.renderer
+        renderer.clear()
         # Draw others if game is active.
-        if self.game_active:            
+        if self.game_active:
+            # Draw moving things part of the way back to where they were
+            # a tick ago.
+            bullet_dy = round(self.core.bullet_step * (1 - alpha))
+            alien_dx = round(self.core.alien_step * (alpha - 1))
+
             for bullet in self.bullets.sprites():
-                bullet.draw_bullet()
-            self.ship.blitme()
-            self.aliens.draw(self.screen)
+                renderer.add(bullet.draw_bullet(bullet_dy))
+            if self._ship_visible():
+                renderer.add(self.ship.blitme(alpha))
+            renderer.add(self.fleet_renderer.draw(alien_dx))
 
             # Draw the score information.
-            self.sb.show_score() 
-            self._show_ships_left()
+            if self.hud_stale and self.governor.due('hud_every'):
+                self.sb.prep_score()
+                self.sb.prep_high_score()
+                self.hud_stale = False
+            renderer.add(self.sb.show_score())
+            renderer.add(self._show_ships_left())
 
         # Draw the play button if the game is inactive.
         if not self.game_active:
-            self.play_button.draw_button()
-            self.easy_button.draw_button()
-            self.medium_button.draw_button()
-            self.hard_button.draw_button()
-
-        for explosion in self.explosions.sprites():
-            explosion.draw()
-
-        pygame.display.flip()
-    
-    def _create_fleet(self):
-        """Create the fleet of aliens."""
-        alien = Alien(self)
-        alien_width, alien_height = alien.rect.size
-
-        current_x, current_y = alien_width, alien_height
-        while current_y < (self.settings.screen_height - 8 * alien_height):
-            while current_x < (self.settings.screen_width - 2 * alien_width):
-                self._create_alien(current_x, current_y)
-                current_x += uniform(1, 1.9) * alien_width
-
-            # Finished a row, reset x value, and increment y value.
-            current_x = alien_width + uniform(0, 8)
-            current_y += uniform(1, 1.9) * alien_width
-
-    def _create_alien(self, x_position, y_position):
-        """Create an alien and place it in the row."""
-        new_alien = Alien(self)
-        new_alien.x = x_position
-        new_alien.rect.x = x_position
-        new_alien.rect.y = y_position
-        self.aliens.add(new_alien)
-
-    def _update_aliens(self):
-        """Check if the fleet is at an edge, then update positions."""
-        self._check_fleet_edges()
-        self.aliens.update()
-
-        # Look for alien-ship collisions.
-        if pygame.sprite.spritecollideany(self.ship, self.aliens):
-            self._ship_hit()
-
-        # Look for aliens hitting the bottom of the screen.
-        self._check_aliens_bottom()
-
-    def _check_fleet_edges(self):
-        """Respond appropriately if any aliens have reached an edge."""
-        for alien in self.aliens.sprites():
-            if alien.check_edges():
-                self._change_fleet_direction()
-                break
-    
-    def _change_fleet_direction(self):
-        """Droop the entire fleet and change the fleet's direction."""
-        for alien in self.aliens.sprites():
-            alien.rect.y += self.settings.fleet_drop_speed
-        self.settings.fleet_direction *= -1
-
-    def _ship_hit(self):
-        """Respond to the ship being hit by an alien."""
-        # Play explosion sound
-        self.explosion_sound.play()
-
-        # Display explosion animation
-        for frame in self.explosion_frames:
-            self.screen.blit(frame, self.ship.rect)
-            pygame.display.flip()
-            pygame.time.delay(100)
-
-        # Decrement ships_left.
-        if self.stats.ships_left > 0:
-            self.stats.ships_left -= 1
-            self.sb.prep_ships()
-
-            # Get rid of any remaining aliens and bullets.
-            self.aliens.empty()
-            self.bullets.empty()
-
-            # Create a new fleet and center the ship.
-            self._create_fleet()
-            self.ship.center_ship()
-
-            # Pause.
-            sleep(0.5)
-        else:
-            self.game_active = False
-            pygame.mouse.set_visible(True)
-
-    def _get_explosion_frames(self):
-        """Extract frames from the explosion sprite sheet."""
-        frames = []
-        sheet_width, sheet_height = self.explosion_sheet.get_size()
-        frame_width = sheet_width // 5  # Assuming 5 frames in the sheet
-        frame_height = sheet_height
-
-        for i in range(5):
-            frame = self.explosion_sheet.subsurface(pygame.Rect(
-                i * frame_width, 0, frame_width, frame_height))
-            frames.append(frame)
-
-        return frames
-
-    def _check_aliens_bottom(self):
-        """Check if any aliens have reached the bottom of the screen."""
-        for alien in self.aliens.sprites():
-            if alien.rect.bottom >= self.settings.screen_height:
-                # Treat this same as if the ship got hit. 
-                self._ship_hit()
-                break
-
-    def _check_play_button(self, mouse_pos):
-        """Start a new game when the player clicks Play."""
-        button_clicked = self.play_button.rect.collidepoint(mouse_pos)
-        if button_clicked and not self.game_active:
-            self.start_game()
+            renderer.add(self.play_button.draw_button())
+            renderer.add(self.easy_button.draw_button())
+            renderer.add(self.medium_button.draw_button())
+            renderer.add(self.hard_button.draw_button())
+            renderer.add(self.sb.show_leaderboard())
+
+        renderer.add(self.screen.blits(
+            [(explosion.image, explosion.rect) for explosion in self.explosions.sprites()]))
+
+        if self.profiler.enabled:
+            renderer.add(self.profiler_overlay.draw())
+
+        renderer.present()
+        self.input_handler.frame_presented()
+        if 'interactive_ms' not in self.startup_times:
+            self._mark_startup('interactive_ms')
+
+    def _show_ship_hit(self, ship_rect):
+        """Play a slow, loud explosion where the ship was hit."""
+        self.audio.play('ship_hit')
+        explosion = self.explosion_pool.acquire(ship_rect.center, 100)
+        self.explosions.add(explosion)
 
-    def _check_difficulty_buttons(self, mouse_pos):
-        """Check if a difficulty button is clicked."""
-        if not self.game_active:
-            if self.easy_button.rect.collidepoint(mouse_pos):
-                self.settings.difficulty = 'easy'
-                self.start_game()
-            elif self.medium_button.rect.collidepoint(mouse_pos):
-                self.settings.difficulty = 'medium'
-                self.start_game()
-            elif self.hard_button.rect.collidepoint(mouse_pos):
-                self.settings.difficulty = 'hard'
-                self.start_game()
-
-    def _check_back_button(self, mouse_pos):
+    def _ship_visible(self):
+        """Hide the ship while it respawns, and blink it while invulnerable."""
+        if self.core.ship_respawning:
+            return False
+        return (self.core.invulnerable_ticks // 6) % 2 == 0
+
+    def _track_hit_sequence(self, frame_ms):
+        """Record frame times while a lost ship explodes and respawns."""
+        if self.core.ship_respawning:
+            self.hit_frame_times.append(frame_ms)
+        elif self.hit_frame_times:
+            # The sequence just finished; compare it with the frame budget.
+            budget_ms = 1000 / (self.settings.frame_rate or self.settings.tick_rate)
+            self.last_hit_sequence = {
+                'frames': len(self.hit_frame_times),
+                'max_frame_ms': max(self.hit_frame_times),
+                'budget_ms': budget_ms,
+                'frames_over_budget': sum(
+                    1 for ms in self.hit_frame_times if ms > budget_ms),
+            }
+            self.hit_frame_times = []
+
+    def _check_buttons(self, mouse_pos):
+        """Run the action of the menu button under the mouse, if any."""
+        if self.game_active:
+            return
+        for button, action in self.menu_buttons:
+            if button.rect.collidepoint(mouse_pos):
+                action()
+                return
+
+    def _start_difficulty(self, difficulty):
+        """Start a new game at the clicked difficulty."""
+        self.settings.difficulty = difficulty
+        self.start_game()
+
+    def _back_to_main_screen(self):
         """Return to the main screen when the Back button is clicked."""
-        if self.show_difficulty_buttons and self.back_button.rect.collidepoint(mouse_pos):
+        if self.show_difficulty_buttons:
             self.show_difficulty_buttons = False
 
     def start_game(self):
-        """
-        Resets all statistics bullets , aliens ; create new fleet
-        and center the ship.
-        """
-        # Reset the game statisitcs.
-        
-        self.stats.reset_stats()
+        """Start a new game in the core and reset the scoreboard."""
+        seed = self.settings.seed
+        if seed is None:
+            seed = randrange(2 ** 32)
+        self.core.start_game(seed)
+
+        if self.settings.record_dir:
+            self.recorder = InputRecorder(self.core, seed)
         self.sb.prep_score()
         self.sb.prep_level()
-        self.game_active = True
+        self._load_leaderboard()
+        self.rewind_buffer.clear()
         self.show_difficulty_buttons = False
-
-        # Get rid of any remaining bullets and aliens.
-        self.bullets.empty()
-        self.aliens.empty()
-
-        # Create a new fleet and center the ship .
-        self._create_fleet()
-        self.ship.center_ship()
-
-        #Reset the game settings.
-        self.settings.initialize_dynamic_settings()
+        self.input_handler.reset()
+        self.inputs = TickInput()
+
+    def _toggle_profiler(self):
+        """Turn the frame profiler and its overlay on or off."""
+        self.profiler.enabled = not self.profiler.enabled
+        self.core.profiler = self.profiler if self.profiler.enabled else None
+        self.renderer.invalidate()
+
+    def _toggle_trace(self):
+        """Start a trace, or write the running one to Settings.trace_path."""
+        if self.profiler.tracing:
+            self.profiler.export_trace(asset_path(self.settings.trace_path))
+        else:
+            if not self.profiler.enabled:
+                self._toggle_profiler()
+            self.profiler.start_trace()
+
+    def _save_recording(self):
+        """Write the current game's replay to Settings.record_dir."""
+        if self.recorder is None:
+            return
+        os.makedirs(self.settings.record_dir, exist_ok=True)
+        filename = f"game-{strftime('%Y%m%d-%H%M%S')}-{self.recorder.seed}.aireplay"
+        self.recorder.save(os.path.join(self.settings.record_dir, filename))
+        self.recorder = None
 
     def _show_ships_left(self):
-        """Show how many ships are left."""
-        for ship_number in range(self.stats.ships_left):
-            self.screen.blit(self.heart_image, (10 + ship_number * self.heart_image.get_width(), 10))
+        """Show how many ships are left and return the rects drawn."""
+        return [self.screen.blit(self.heart_image, (10 + ship_number * self.heart_image.get_width(), 10))
+                for ship_number in range(self.stats.ships_left)]
 
 if __name__ == "__main__":
+    parser = ArgumentParser(description="Play Alien Invasion.")
+    parser.add_argument('--seed', type=int, help="seed for repeatable fleets")
+    parser.add_argument('--record', metavar='DIR', help="save a replay of every game in DIR")
+    parser.add_argument('--spectate', type=int, metavar='PORT',
+                        help="stream the game to spectators on this port")
+    parser.add_argument('--display', choices=('window', 'scaled', 'integer'),
+                        default='scaled', help="how the game is scaled to the window")
+    parser.add_argument('--fullscreen', action='store_true', help="start fullscreen")
+    parser.add_argument('--startup-report', action='store_true',
+                        help="print how long the game took to start")
+    args = parser.parse_args()
+
+    settings = Settings()
+    settings.seed = args.seed
+    settings.record_dir = args.record
+    settings.startup_report = args.startup_report
+    settings.spectator_port = args.spectate
+    settings.display_mode = args.display
+    settings.fullscreen = args.fullscreen
+
     # Make a game instance, and run the game.
-    ai = AlienInvasion()
+    ai = AlienInvasion(settings)
     ai.run_game()
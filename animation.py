@@ -0,0 +1,26 @@
+import pygame
+
+
+class AnimationAtlas:
+    """
+    Animation frames cut once from a sprite sheet and shared by every
+    animation that plays them.
+    """
+
+    def __init__(self, sheet, frame_count, frame_time=20):
+        """Slice a horizontal strip of frame_count frames from sheet."""
+        frame_width = sheet.get_width() // frame_count
+        frame_height = sheet.get_height()
+        self.frames = [sheet.subsurface(pygame.Rect(
+            i * frame_width, 0, frame_width, frame_height)) for i in range(frame_count)]
+        self.frame_size = (frame_width, frame_height)
+
+        # Default milliseconds each frame stays on screen.
+        self.frame_time = frame_time
+
+    def frame_at(self, elapsed, frame_time=None):
+        """Return the frame to show elapsed ms into the animation, or None once it's over."""
+        index = int(elapsed // (frame_time or self.frame_time))
+        if index < len(self.frames):
+            return self.frames[index]
+        return None
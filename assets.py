@@ -0,0 +1,274 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+from time import perf_counter
+
+import pygame
+
+# Folder the game lives in, so assets load no matter the working directory.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Image and sound files the game uses, keyed by name.
+IMAGE_FILES = {
+    'alien': os.path.join('images', 'alien.bmp'),
+    'bullet': os.path.join('images', 'bullet.bmp'),
+    'ship': os.path.join('images', 'ship.bmp'),
+    'heart': os.path.join('images', 'heart.bmp'),
+    'explosion_sheet': os.path.join('images', 'explosion_sheet.png'),
+}
+SOUND_FILES = {
+    'explosion': os.path.join('sounds', 'explosion.wav'),
+}
+MUSIC_FILES = {
+    'background': os.path.join('sounds', 'background_music.mp3'),
+}
+
+# The images and sounds baked into one file by bake_assets.py. It starts
+# with a header and a JSON manifest, then the raw data the manifest
+# points into: an RGBA atlas of every image, and each sound's PCM.
+BAKE_FILE = os.path.join('cache', 'assets.bake')
+BAKE_MAGIC = b'AIBK'
+BAKE_VERSION = 1
+# Magic, version, and the manifest's length in bytes.
+BAKE_HEADER = struct.Struct('<4sHI')
+
+
+def asset_path(relative_path):
+    """Return the full path of a file inside the game folder."""
+    return os.path.join(BASE_DIR, relative_path)
+
+
+def _source_paths():
+    """Return the path of every image and sound file the bake is made from."""
+    return list(IMAGE_FILES.values()) + list(SOUND_FILES.values())
+
+
+def _file_hash(path):
+    """Return the SHA-256 of a file in the game folder."""
+    with open(asset_path(path), 'rb') as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def source_info():
+    """Return [size, modified time, SHA-256] for every source file, keyed by path."""
+    info = {}
+    for path in _source_paths():
+        stat = os.stat(asset_path(path))
+        info[path.replace(os.sep, '/')] = [stat.st_size, stat.st_mtime_ns, _file_hash(path)]
+    return info
+
+
+def sources_match(recorded):
+    """
+    Return True if every source file still has the hash recorded for it.
+    A file whose size and modified time are unchanged isn't read again.
+    """
+    paths = _source_paths()
+    if len(recorded) != len(paths):
+        return False
+    for path in paths:
+        entry = recorded.get(path.replace(os.sep, '/'))
+        if entry is None:
+            return False
+        size, mtime, digest = entry
+        stat = os.stat(asset_path(path))
+        if (stat.st_size, stat.st_mtime_ns) != (size, mtime) and _file_hash(path) != digest:
+            return False
+    return True
+
+
+def read_bake(path):
+    """
+    Memory-map a baked asset file. Return its manifest and a view of the
+    data after it, or (None, None) if there's no such file, it was baked
+    by another version, or it's cut short or damaged. Pages are only read
+    as the data is used, and the file is unmapped once nothing uses the
+    view.
+    """
+    try:
+        with open(path, 'rb') as file:
+            contents = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        # mmap() refuses empty files with a ValueError.
+        return None, None
+    if len(contents) < BAKE_HEADER.size:
+        return None, None
+    magic, version, manifest_size = BAKE_HEADER.unpack_from(contents)
+    if magic != BAKE_MAGIC or version != BAKE_VERSION:
+        return None, None
+    data_start = BAKE_HEADER.size + manifest_size
+    try:
+        manifest = json.loads(contents[BAKE_HEADER.size:data_start])
+    except ValueError:
+        # A file cut off or garbled inside the manifest.
+        return None, None
+    data = memoryview(contents)[data_start:]
+    try:
+        chunks = [manifest['atlas'][:2], *manifest['sounds'].values()]
+        complete = all(offset + length <= len(data) for offset, length in chunks)
+    except (KeyError, TypeError, ValueError, AttributeError):
+        complete = False
+    if not complete:
+        # Cut off in the data, or a manifest that doesn't describe it.
+        return None, None
+    return manifest, data
+
+
+class AssetRegistry:
+    """A class to load images and sounds once and share them by key."""
+
+    def __init__(self, use_bake=True):
+        """Initialize the caches and the load counters."""
+        self.images = {}
+        self.sounds = {}
+
+        # Load from the baked file when it matches the sources.
+        self.use_bake = use_bake
+        self.baked = False
+
+        # Images loaded on the background thread, waiting to be converted.
+        self.raw_images = {}
+        self.loaded = 0
+        self.load_error = None
+        self.thread = None
+
+        # Counters to show how often the caches save a load.
+        self.hits = 0
+        self.misses = 0
+        self.load_time = 0.0
+
+    def start_loading(self):
+        """Start loading every image and sound on a background thread."""
+        self.thread = threading.Thread(target=self._load_all, daemon=True)
+        self.thread.start()
+
+    def _load_all(self):
+        """Read and decode every file; runs on the loading thread."""
+        try:
+            if self.use_bake and self._load_baked():
+                return
+            for key, path in IMAGE_FILES.items():
+                start = perf_counter()
+                self.raw_images[key] = pygame.image.load(asset_path(path))
+                self.load_time += perf_counter() - start
+                self.misses += 1
+                self.loaded += 1
+            for key, path in SOUND_FILES.items():
+                start = perf_counter()
+                self.sounds[key] = pygame.mixer.Sound(asset_path(path))
+                self.load_time += perf_counter() - start
+                self.misses += 1
+                self.loaded += 1
+        except Exception as error:
+            self.load_error = error
+
+    def _load_baked(self):
+        """
+        Load everything from the baked file; return False if it's missing,
+        stale, or damaged, so the files are loaded instead.
+        """
+        start = perf_counter()
+        manifest, data = read_bake(asset_path(BAKE_FILE))
+        if manifest is None:
+            return False
+        try:
+            if (not sources_match(manifest['sources'])
+                    or tuple(manifest['mixer']) != pygame.mixer.get_init()):
+                return False
+            offset, length, width, height = manifest['atlas']
+            atlas = pygame.image.frombuffer(data[offset:offset + length], (width, height), 'RGBA')
+            for key, (x, y, width, height, alpha) in manifest['images'].items():
+                image = atlas.subsurface(pygame.Rect(x, y, width, height))
+                if not alpha:
+                    # Opaque in the files, so converted without alpha too.
+                    image.set_alpha(None)
+                self.raw_images[key] = image
+            for key, (offset, length) in manifest['sounds'].items():
+                self.sounds[key] = pygame.mixer.Sound(buffer=data[offset:offset + length])
+        except (KeyError, IndexError, TypeError, ValueError, AttributeError, pygame.error):
+            # The manifest doesn't describe the data, so drop what was read.
+            self.raw_images.clear()
+            self.sounds.clear()
+            return False
+
+        self.load_time += perf_counter() - start
+        self.misses += len(self.raw_images) + len(manifest['sounds'])
+        self.loaded = len(IMAGE_FILES) + len(SOUND_FILES)
+        self.baked = True
+        return True
+
+    def progress(self):
+        """Return how much of the background load is done, from 0 to 1."""
+        return self.loaded / (len(IMAGE_FILES) + len(SOUND_FILES))
+
+    def loading_done(self):
+        """Return True once the background thread has stopped."""
+        return self.thread is None or not self.thread.is_alive()
+
+    def finish_loading(self):
+        """
+        Wait for the background load, then convert its images. Converting
+        needs the display, so this has to run on the main thread.
+        """
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        if self.load_error is not None:
+            raise self.load_error
+        for key, image in self.raw_images.items():
+            self.images[key] = self._convert(image)
+        self.raw_images.clear()
+
+    def image(self, key):
+        """Return the shared surface for an image key."""
+        image = self.images.get(key)
+        if image is not None:
+            self.hits += 1
+            return image
+
+        self.misses += 1
+        start = perf_counter()
+        image = self._convert(pygame.image.load(asset_path(IMAGE_FILES[key])))
+        self.load_time += perf_counter() - start
+
+        self.images[key] = image
+        return image
+
+    def _convert(self, image):
+        """Match the display format so blits don't convert every frame."""
+        if pygame.display.get_surface() is None:
+            return image
+        if image.get_alpha() is not None:
+            return image.convert_alpha()
+        return image.convert()
+
+    def sound(self, key):
+        """Return the shared Sound for a sound key."""
+        sound = self.sounds.get(key)
+        if sound is not None:
+            self.hits += 1
+            return sound
+
+        self.misses += 1
+        start = perf_counter()
+        sound = pygame.mixer.Sound(asset_path(SOUND_FILES[key]))
+        self.load_time += perf_counter() - start
+
+        self.sounds[key] = sound
+        return sound
+
+    def music_path(self, key):
+        """Return the path of a music file, for streaming with mixer.music."""
+        return asset_path(MUSIC_FILES[key])
+
+    def stats(self):
+        """Return the cache counters as a dictionary."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'load_time_ms': self.load_time * 1000,
+            'baked': self.baked,
+        }
@@ -0,0 +1,124 @@
+import pygame
+
+# Each effect: the sound asset it plays, its channel category, volume,
+# how many copies may play at once, and the least time between plays (ms).
+EFFECTS = {
+    'explosion': {'sound': 'explosion', 'category': 'effects', 'volume': 0.1,
+                  'max_voices': 4, 'cooldown': 30},
+    'ship_hit': {'sound': 'explosion', 'category': 'ship', 'volume': 1.0,
+                 'max_voices': 1, 'cooldown': 0},
+}
+
+# Mixer channels reserved for each category, so a burst of one kind of
+# sound can never take the channels another kind needs.
+CATEGORY_CHANNELS = {
+    'effects': 6,
+    'ship': 2,
+}
+
+
+class AudioManager:
+    """
+    Play sound effects from shared, preloaded buffers, and stream music.
+
+    Every effect is decoded once, by the AssetRegistry. Plays go to the
+    channels reserved for the effect's category; a play is dropped when
+    the effect is at its voice limit, still cooling down, or its
+    category has no free channel.
+    """
+
+    def __init__(self, assets):
+        """Reserve the channels and look up every effect's sound."""
+        self.assets = assets
+        self.enabled = pygame.mixer.get_init() is not None
+
+        self.channels = {}
+        self.effects = {}
+        self.voices = {name: [] for name in EFFECTS}
+        self.last_played = {name: -10 ** 9 for name in EFFECTS}
+        self.max_voices = {name: effect['max_voices'] for name, effect in EFFECTS.items()}
+
+        # Counters for stats().
+        self.played = 0
+        self.dropped = 0
+
+        if not self.enabled:
+            return
+
+        # Reserved channels are never picked by Sound.play(), only by us.
+        reserved = sum(CATEGORY_CHANNELS.values())
+        pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), reserved + 4))
+        pygame.mixer.set_reserved(reserved)
+        first = 0
+        for category, count in CATEGORY_CHANNELS.items():
+            self.channels[category] = [pygame.mixer.Channel(number)
+                                       for number in range(first, first + count)]
+            first += count
+
+        for name, effect in EFFECTS.items():
+            self.effects[name] = assets.sound(effect['sound'])
+
+    def play(self, name, now=None):
+        """Play an effect, unless a limit stops it; return True if it played."""
+        if not self.enabled:
+            return False
+        effect = EFFECTS[name]
+        if now is None:
+            now = pygame.time.get_ticks()
+
+        # Forget voices that have finished or been taken over.
+        sound = self.effects[name]
+        voices = [channel for channel in self.voices[name]
+                  if channel.get_busy() and channel.get_sound() is sound]
+        self.voices[name] = voices
+
+        if (now - self.last_played[name] < effect['cooldown']
+                or len(voices) >= self.max_voices[name]):
+            self.dropped += 1
+            return False
+
+        channel = self._free_channel(effect['category'])
+        if channel is None:
+            self.dropped += 1
+            return False
+
+        channel.set_volume(effect['volume'])
+        channel.play(sound)
+        voices.append(channel)
+        self.last_played[name] = now
+        self.played += 1
+        return True
+
+    def set_voice_limit(self, name, count):
+        """Let at most count copies of an effect play at once, up to its usual limit."""
+        self.max_voices[name] = min(count, EFFECTS[name]['max_voices'])
+
+    def _free_channel(self, category):
+        """Return an idle channel of the category, or None."""
+        for channel in self.channels[category]:
+            if not channel.get_busy():
+                return channel
+        return None
+
+    def play_music(self, key, volume=0.5):
+        """Stream a music file on a loop; it's decoded as it plays, not up front."""
+        if not self.enabled:
+            return
+        pygame.mixer.music.load(self.assets.music_path(key))
+        pygame.mixer.music.set_volume(volume)
+        pygame.mixer.music.play(-1)  # -1 means the music will loop indefinitely
+
+    def stop(self):
+        """Stop the music and every effect."""
+        if self.enabled:
+            pygame.mixer.music.stop()
+            pygame.mixer.stop()
+
+    def stats(self):
+        """Return the mixer counters as a dictionary."""
+        return {
+            'active_voices': {category: sum(channel.get_busy() for channel in channels)
+                              for category, channels in self.channels.items()},
+            'played': self.played,
+            'dropped': self.dropped,
+        }
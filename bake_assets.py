@@ -0,0 +1,142 @@
+"""
+Bake the game's images and sounds into one file the game memory-maps.
+
+Every image is packed into a single RGBA atlas, and every sound effect
+is decoded to raw PCM in the mixer's format, so startup does no image
+or audio decoding at all. The file records the SHA-256 of each source,
+and the game loads the sources instead once any of them change; only
+files whose size or modified time changed are hashed again. The mixer
+format depends on the audio device, so bake on the machine that plays
+the game.
+
+    python bake_assets.py            # bake if the sources changed
+    python bake_assets.py --force    # bake anyway
+    python bake_assets.py --compare  # time loading from files and from the bake
+"""
+import json
+import os
+import sys
+from argparse import ArgumentParser
+from statistics import median
+
+import pygame
+
+from assets import (AssetRegistry, BAKE_FILE, BAKE_HEADER, BAKE_MAGIC, BAKE_VERSION,
+                    IMAGE_FILES, SOUND_FILES, asset_path, read_bake, source_info,
+                    sources_match)
+
+
+def pack_atlas(sizes, width=256):
+    """
+    Place rectangles of the given sizes in rows, tallest first. Return
+    each one's position, keyed like sizes, and the atlas size.
+    """
+    width = max([width] + [w for w, _ in sizes.values()])
+    positions = {}
+    x = y = row_height = 0
+    for key in sorted(sizes, key=lambda key: -sizes[key][1]):
+        w, h = sizes[key]
+        if x + w > width:
+            x = 0
+            y += row_height
+            row_height = 0
+        positions[key] = (x, y)
+        x += w
+        row_height = max(row_height, h)
+    return positions, (width, y + row_height)
+
+
+def bake(path=BAKE_FILE, force=False):
+    """Write the baked file unless it already matches the sources; return True if written."""
+    # Keep only the manifest, so the old file isn't mapped when it's replaced.
+    manifest = read_bake(asset_path(path))[0]
+    if (not force and manifest is not None and sources_match(manifest.get('sources', {}))
+            and tuple(manifest.get('mixer', ())) == pygame.mixer.get_init()):
+        return False
+
+    images = {key: pygame.image.load(asset_path(file)) for key, file in IMAGE_FILES.items()}
+    positions, atlas_size = pack_atlas({key: image.get_size() for key, image in images.items()})
+    atlas = pygame.Surface(atlas_size, pygame.SRCALPHA, 32)
+    for key, image in images.items():
+        # Copy the pixels as they are, alpha included.
+        atlas.blit(image, positions[key], special_flags=pygame.BLEND_RGBA_ADD)
+
+    chunks = [pygame.image.tobytes(atlas, 'RGBA')]
+    manifest = {
+        'sources': source_info(),
+        'mixer': pygame.mixer.get_init(),
+        'atlas': [0, len(chunks[0]), *atlas_size],
+        'images': {key: [*positions[key], *image.get_size(), image.get_alpha() is not None]
+                   for key, image in images.items()},
+        'sounds': {},
+    }
+    offset = len(chunks[0])
+    for key, file in SOUND_FILES.items():
+        pcm = pygame.mixer.Sound(asset_path(file)).get_raw()
+        manifest['sounds'][key] = [offset, len(pcm)]
+        chunks.append(pcm)
+        offset += len(pcm)
+
+    manifest_bytes = json.dumps(manifest, separators=(',', ':')).encode()
+    full_path = asset_path(path)
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    # Write a new file and swap it in, so a reader never sees half a bake.
+    with open(full_path + '.tmp', 'wb') as file:
+        file.write(BAKE_HEADER.pack(BAKE_MAGIC, BAKE_VERSION, len(manifest_bytes)))
+        file.write(manifest_bytes)
+        for chunk in chunks:
+            file.write(chunk)
+    os.replace(full_path + '.tmp', full_path)
+    return True
+
+
+def load_time(use_bake):
+    """Load every asset the way the game does at startup; return the ms it took."""
+    assets = AssetRegistry(use_bake)
+    assets.start_loading()
+    assets.finish_loading()
+    if assets.baked != use_bake:
+        sys.exit("The bake was not used." if use_bake else "The files were not used.")
+    return assets.stats()['load_time_ms'], assets
+
+
+def compare(runs=20):
+    """Time both ways of loading, and check they give the same assets."""
+    pygame.display.set_mode((1, 1))
+    file_times, bake_times = [], []
+    for _ in range(runs):
+        ms, from_files = load_time(False)
+        file_times.append(ms)
+        ms, from_bake = load_time(True)
+        bake_times.append(ms)
+
+    for key in IMAGE_FILES:
+        a, b = from_files.images[key], from_bake.images[key]
+        if (a.get_size() != b.get_size() or a.get_alpha() != b.get_alpha()
+                or pygame.image.tobytes(a, 'RGBA') != pygame.image.tobytes(b, 'RGBA')):
+            sys.exit(f"The baked {key!r} image differs from its file.")
+    for key in SOUND_FILES:
+        if from_files.sounds[key].get_raw() != from_bake.sounds[key].get_raw():
+            sys.exit(f"The baked {key!r} sound differs from its file.")
+
+    size = os.path.getsize(asset_path(BAKE_FILE))
+    print(f"Files: {median(file_times):.2f} ms, bake: {median(bake_times):.2f} ms"
+          f" (median of {runs}); bake is {size:,} bytes. The assets match.")
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description="Bake Alien Invasion's images and sounds.")
+    parser.add_argument('--force', action='store_true', help="bake even if up to date")
+    parser.add_argument('--compare', action='store_true',
+                        help="time loading from files against loading the bake")
+    args = parser.parse_args()
+
+    pygame.mixer.init()
+    if bake(force=args.force):
+        print(f"Baked {len(IMAGE_FILES)} images and {len(SOUND_FILES)} sounds"
+              f" into {BAKE_FILE}.")
+    else:
+        print(f"{BAKE_FILE} is up to date.")
+    if args.compare:
+        compare()
+    pygame.quit()
@@ -0,0 +1,248 @@
+"""
+Run many headless games at once, for evaluating bots.
+
+Games run on GameCore under the SDL dummy drivers, split across a pool
+of worker processes. Each worker steps its share of the games together
+through VectorGames, asking a policy for every game's input each tick.
+
+    python batch_runner.py --games 64 --workers 8 --policy tracking
+    python batch_runner.py --policy mybots:Bot --max-ticks 36000
+"""
+import os
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import importlib
+import json
+from argparse import ArgumentParser
+from multiprocessing import Pool
+from random import Random
+from time import perf_counter
+
+from settings import Settings
+from assets import AssetRegistry
+from game_core import GameCore, TickInput
+
+
+class Observation:
+    """What a policy sees of one game before a tick."""
+
+    def __init__(self, core):
+        """Read the parts of the game a bot needs."""
+        self.ship_x = core.ship.rect.centerx
+        self.ship_width = core.ship.rect.width
+        self.screen_width = core.settings.screen_width
+        self.score = core.stats.score
+        self.level = core.stats.level
+        self.ships_left = core.stats.ships_left
+        self.aliens_left = len(core.fleet) if core.fleet is not None else len(core.aliens)
+        self.target_x = _lowest_alien_x(core)
+        self.respawning = core.ship_respawning
+
+
+def _lowest_alien_x(core):
+    """Return the center x of the living alien nearest the bottom, or None."""
+    fleet = core.fleet
+    if fleet is not None:
+        living = fleet.living().nonzero()[0]
+        if not len(living):
+            return None
+        index = living[fleet.y[living].argmax()]
+        return float(fleet.x[index]) + fleet.alien_width / 2
+
+    lowest = max(core.aliens.sprites(), key=lambda alien: alien.rect.bottom, default=None)
+    return lowest.rect.centerx if lowest is not None else None
+
+
+# A policy is any class whose instances have reset(seed) and
+# act(observation) -> TickInput. One instance plays one game at a time.
+
+class SweepPolicy:
+    """Sweep from side to side, firing every tick."""
+
+    def reset(self, seed):
+        """Start heading right."""
+        self.right = True
+
+    def act(self, observation):
+        """Turn around at the edges of the screen."""
+        if observation.ship_x + observation.ship_width >= observation.screen_width:
+            self.right = False
+        elif observation.ship_x - observation.ship_width <= 0:
+            self.right = True
+        return TickInput(move_left=not self.right, move_right=self.right, fire=True)
+
+
+class RandomPolicy:
+    """Press random keys."""
+
+    def reset(self, seed):
+        """Seed the bot's own random numbers."""
+        self.rng = Random(seed)
+
+    def act(self, observation):
+        """Pick each key at random."""
+        rng = self.rng
+        return TickInput(rng.random() < 0.5, rng.random() < 0.5, rng.random() < 0.3)
+
+
+class TrackingPolicy:
+    """Move under the lowest alien and fire."""
+
+    def reset(self, seed):
+        """Nothing to remember between games."""
+
+    def act(self, observation):
+        """Close in on the lowest alien, firing when under it."""
+        if observation.target_x is None:
+            return TickInput(fire=True)
+        offset = observation.target_x - observation.ship_x
+        return TickInput(move_left=offset < -4, move_right=offset > 4, fire=abs(offset) < 30)
+
+
+POLICIES = {
+    'sweep': SweepPolicy,
+    'random': RandomPolicy,
+    'tracking': TrackingPolicy,
+}
+
+
+def load_policy(name):
+    """Return the policy class for a built-in name or a 'module:Class' path."""
+    if name in POLICIES:
+        return POLICIES[name]
+    module_name, _, class_name = name.partition(':')
+    if not class_name:
+        raise ValueError(f"Unknown policy {name!r}; use one of {sorted(POLICIES)} "
+                         f"or 'module:Class'.")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+class VectorGames:
+    """
+    Several headless games stepped together.
+
+    reset() starts every game from a list of seeds and step() advances
+    every game by one tick, so a batch of games can be driven like one.
+    """
+
+    def __init__(self, count, difficulty='medium'):
+        """Build count headless games sharing one set of images."""
+        assets = AssetRegistry()
+        self.cores = []
+        for _ in range(count):
+            # Each game changes its own speeds as it levels up.
+            settings = Settings()
+            settings.difficulty = difficulty
+            self.cores.append(GameCore(settings, assets=assets))
+
+    def reset(self, seeds):
+        """Start a new game in each core; return their observations."""
+        for core, seed in zip(self.cores, seeds):
+            core.start_game(seed)
+        return [Observation(core) for core in self.cores]
+
+    def step(self, actions):
+        """
+        Step every core with its TickInput and return (observations,
+        score gained this tick, done flags). Finished games stay finished.
+        """
+        observations, rewards, dones = [], [], []
+        for core, action in zip(self.cores, actions):
+            score = core.stats.score
+            core.step(action)
+            observations.append(Observation(core))
+            rewards.append(core.stats.score - score)
+            dones.append(not core.game_active)
+        return observations, rewards, dones
+
+
+def run_games(policy_name, seeds, difficulty, max_ticks):
+    """Play one game per seed together in this process; return their results."""
+    policy_class = load_policy(policy_name)
+    games = VectorGames(len(seeds), difficulty)
+    policies = [policy_class() for _ in seeds]
+    for policy, seed in zip(policies, seeds):
+        policy.reset(seed)
+
+    observations = games.reset(seeds)
+    done = [False] * len(seeds)
+    ticks = [0] * len(seeds)
+    for _ in range(max_ticks):
+        # Finished games get no input; stepping them does nothing.
+        actions = [TickInput() if finished else policy.act(observation)
+                   for policy, observation, finished in zip(policies, observations, done)]
+        observations, _, dones = games.step(actions)
+        for index, finished in enumerate(dones):
+            if not done[index]:
+                ticks[index] += 1
+                done[index] = finished
+        if all(done):
+            break
+
+    return [{
+        'seed': seed,
+        'score': core.stats.score,
+        'level': core.stats.level,
+        'ticks': game_ticks,
+        'finished': finished,
+    } for seed, core, game_ticks, finished in zip(seeds, games.cores, ticks, done)]
+
+
+def _run_chunk(job):
+    """Pool entry point: unpack a job and run it."""
+    return run_games(*job)
+
+
+def run_batch(policy_name, games, workers, difficulty='medium', max_ticks=36_000,
+              seed=1, games_per_worker=None):
+    """
+    Play games games split across workers processes and return one result
+    per game, in seed order.
+    """
+    seeds = [Random(seed + number).randrange(2 ** 32) for number in range(games)]
+
+    # A few chunks per worker keeps them all busy when games end unevenly.
+    if games_per_worker is None:
+        games_per_worker = max(1, games // (workers * 4))
+    jobs = [(policy_name, seeds[start:start + games_per_worker], difficulty, max_ticks)
+            for start in range(0, games, games_per_worker)]
+
+    if workers == 1:
+        chunks = map(_run_chunk, jobs)
+        return [result for chunk in chunks for result in chunk]
+    with Pool(workers) as pool:
+        chunks = pool.map(_run_chunk, jobs, chunksize=1)
+    return [result for chunk in chunks for result in chunk]
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description="Play many headless games with a bot.")
+    parser.add_argument('--policy', default='sweep',
+                        help=f"one of {', '.join(POLICIES)}, or module:Class")
+    parser.add_argument('--games', type=int, default=32)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--difficulty', default='medium', choices=('easy', 'medium', 'hard'))
+    parser.add_argument('--max-ticks', type=int, default=36_000,
+                        help="stop unfinished games after this many ticks")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help="write per-game results as JSON to this file")
+    args = parser.parse_args()
+
+    start = perf_counter()
+    results = run_batch(args.policy, args.games, args.workers, args.difficulty,
+                        args.max_ticks, args.seed)
+    elapsed = perf_counter() - start
+
+    total_ticks = sum(result['ticks'] for result in results)
+    scores = sorted(result['score'] for result in results)
+    print(f"{len(results)} games on {args.workers} workers in {elapsed:.1f}s"
+          f" ({total_ticks / elapsed:,.0f} ticks/s, {len(results) / elapsed * 3600:,.0f} games/hour).")
+    print(f"Score: mean {sum(scores) / len(scores):,.0f}, median {scores[len(scores) // 2]:,},"
+          f" best {scores[-1]:,}; mean level"
+          f" {sum(result['level'] for result in results) / len(results):.1f}.")
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
@@ -0,0 +1,364 @@
+"""
+Scenario benchmarks for Alien Invasion.
+
+Runs scripted load scenarios headless under the SDL dummy drivers and
+reports frame time percentiles per phase, allocations and throughput.
+
+    python benchmark.py --output results.json
+    python benchmark.py --baseline baseline.json --threshold 0.15
+"""
+import os
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import gc
+import json
+import platform
+import sys
+import tracemalloc
+from argparse import ArgumentParser
+from random import Random
+from time import perf_counter
+
+import pygame
+
+from settings import Settings
+from alien_invasion import AlienInvasion
+from game_core import TickInput
+
+PHASES = ('events', 'ship', 'bullets', 'aliens', 'explosions', 'screen')
+
+
+def percentile(sorted_values, fraction):
+    """Return the nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def summarize(times):
+    """Return p50/p95/p99/mean/max of a list of milliseconds."""
+    ordered = sorted(times)
+    return {
+        'p50': percentile(ordered, 0.50),
+        'p95': percentile(ordered, 0.95),
+        'p99': percentile(ordered, 0.99),
+        'mean': sum(ordered) / len(ordered) if ordered else 0.0,
+        'max': ordered[-1] if ordered else 0.0,
+    }
+
+
+# Each scenario sets up Settings before the game is built, and can adjust
+# the started game afterwards (start_game resets the dynamic settings).
+
+def dense_fleet(settings, ai=None):
+    """A screen four times the usual area, filled by _create_fleet."""
+    if ai is None:
+        settings.screen_width *= 2
+        settings.screen_height *= 2
+
+
+def max_bullets(settings, ai=None):
+    """Many more bullets than usual, fired every tick."""
+    settings.bullets_allowed = 200
+    if ai is not None:
+        settings.bullet_speed = 120.0
+
+
+def mass_explosions(settings, ai=None):
+    """A normal game, with a burst of explosions every frame."""
+
+
+def hard_high_level(settings, ai=None):
+    """Hard difficulty after twenty rounds of increase_speed."""
+    settings.difficulty = 'hard'
+    if ai is not None:
+        for _ in range(20):
+            settings.increase_speed()
+        ai.stats.level = 21
+
+
+def stress_wave(settings, ai=None):
+    """Every level is the Stress wave, a grid packed far denser than usual."""
+    settings.wave_override = 'Stress'
+
+
+def ship_hit(settings, ai=None):
+    """A normal game where the ship is hit every few seconds, to time the hit sequence."""
+
+
+def overload(settings, ai=None):
+    """A dense fleet, a full volley and explosions at once, with adaptive quality on."""
+    dense_fleet(settings, ai)
+    max_bullets(settings, ai)
+    settings.adaptive_quality = True
+
+
+SCENARIOS = {
+    'dense_fleet': dense_fleet,
+    'max_bullets': max_bullets,
+    'mass_explosions': mass_explosions,
+    'hard_high_level': hard_high_level,
+    'stress_wave': stress_wave,
+    'ship_hit': ship_hit,
+    'overload': overload,
+}
+
+
+class Benchmark:
+    """Drive one scenario frame by frame and time each phase."""
+
+    def __init__(self, name, seed=1):
+        """Build a game set up for the scenario."""
+        self.name = name
+        self.rng = Random(seed)
+
+        settings = Settings()
+        settings.seed = seed
+        # Keep benchmark games out of the real leaderboard.
+        settings.score_path = ':memory:'
+        # Time the game itself, not the dummy driver's software scaling.
+        settings.display_mode = 'window'
+        # Keep quality fixed, so timings compare run to run.
+        settings.adaptive_quality = False
+        SCENARIOS[name](settings)
+        self.settings = settings
+
+        self.ai = AlienInvasion(settings)
+        self._start_game()
+
+        self.times = {phase: [] for phase in PHASES}
+        self.frame_times = []
+        # Every finished ship-hit sequence, from AlienInvasion._track_hit_sequence().
+        self.hit_sequences = []
+        self._wrap_phases()
+
+    def _start_game(self):
+        """Start a game and apply the scenario to it."""
+        self.ai.start_game()
+        SCENARIOS[self.name](self.settings, self.ai)
+
+    def _wrap_phases(self):
+        """Time the core's phases by wrapping them on this instance only."""
+        core = self.ai.core
+        for phase, name in (('bullets', '_update_bullets'), ('aliens', '_update_aliens')):
+            setattr(core, name, self._timed(phase, getattr(core, name)))
+        core.ship.update = self._timed('ship', core.ship.update)
+
+    def _timed(self, phase, method):
+        """Return method wrapped to add its run time to phase."""
+        times = self.times[phase]
+
+        def timed(*args):
+            start = perf_counter()
+            result = method(*args)
+            times.append((perf_counter() - start) * 1000)
+            return result
+        return timed
+
+    def _inputs(self, frame):
+        """Scripted input: sweep back and forth, fire every tick."""
+        right = (frame // 90) % 2 == 0
+        return TickInput(move_left=not right, move_right=right, fire=True)
+
+    def frame(self, number):
+        """Run and time one frame: events, one tick, explosions, drawing."""
+        ai = self.ai
+        if not ai.game_active:
+            self._start_game()
+        frame_start = perf_counter()
+
+        start = perf_counter()
+        pygame.event.pump()
+        ai._check_events()
+        self.times['events'].append((perf_counter() - start) * 1000)
+
+        ai.inputs = self._inputs(number)
+        ai._run_tick()
+
+        core = ai.core
+        if (self.name == 'ship_hit' and number % 180 == 0
+                and not core.ship_respawning and not core.invulnerable_ticks):
+            # Lose a ship as if an alien hit it, but never the last one.
+            ai.stats.ships_left = max(ai.stats.ships_left, 1)
+            core.events = []
+            core._ship_hit()
+            ai._handle_core_events(core.events)
+
+        if self.name in ('mass_explosions', 'overload'):
+            for _ in range(20):
+                ai._show_explosion((self.rng.randrange(self.settings.screen_width),
+                                    self.rng.randrange(self.settings.screen_height)))
+
+        start = perf_counter()
+        ai._update_explosions()
+        self.times['explosions'].append((perf_counter() - start) * 1000)
+
+        start = perf_counter()
+        ai._update_screen()
+        self.times['screen'].append((perf_counter() - start) * 1000)
+
+        frame_ms = (perf_counter() - frame_start) * 1000
+        self.frame_times.append(frame_ms)
+        finished_sequence = ai.last_hit_sequence
+        ai._track_hit_sequence(frame_ms)
+        if ai.last_hit_sequence is not finished_sequence:
+            self.hit_sequences.append(ai.last_hit_sequence)
+        if ai.governor.end_frame(frame_ms):
+            ai._apply_quality()
+
+    def run(self, frames, warmup=60):
+        """Run the scenario and return its results."""
+        for number in range(warmup):
+            self.frame(number)
+        for times in self.times.values():
+            times.clear()
+        self.frame_times.clear()
+        self.hit_sequences.clear()
+
+        gc_before = sum(stat['collections'] for stat in gc.get_stats())
+        start = perf_counter()
+        for number in range(frames):
+            self.frame(warmup + number)
+        elapsed = perf_counter() - start
+        gc_after = sum(stat['collections'] for stat in gc.get_stats())
+
+        return {
+            'frames': frames,
+            'ticks_per_sec': frames / elapsed,
+            'frame_ms': summarize(self.frame_times),
+            'phases': {phase: summarize(times) for phase, times in self.times.items()},
+            'gc_collections': gc_after - gc_before,
+            'aliens': len(self.ai.aliens),
+            'explosions': len(self.ai.explosions),
+            'fleet_build_ms': summarize([wave['build_ms'] for wave in self.ai.core.wave_stats]),
+            'quality': self.ai.governor.stats(),
+            'hit_sequences': self._hit_sequence_summary(),
+        }
+
+    def _hit_sequence_summary(self):
+        """Sum up the ship-hit sequences run, or return None if there were none."""
+        sequences = self.hit_sequences
+        if not sequences:
+            return None
+        return {
+            'sequences': len(sequences),
+            'frames': sum(sequence['frames'] for sequence in sequences),
+            'max_frame_ms': max(sequence['max_frame_ms'] for sequence in sequences),
+            'budget_ms': sequences[0]['budget_ms'],
+            'frames_over_budget': sum(sequence['frames_over_budget'] for sequence in sequences),
+        }
+
+    def measure_allocations(self, frames):
+        """Run more frames under tracemalloc and report what they allocated."""
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        for number in range(frames):
+            self.frame(number)
+        after, peak = tracemalloc.get_traced_memory()
+        stats = tracemalloc.take_snapshot().compare_to(snapshot, 'filename')
+        tracemalloc.stop()
+        return {
+            'frames': frames,
+            'net_kib': (after - before) / 1024,
+            'peak_kib': (peak - before) / 1024,
+            'blocks_per_frame': sum(stat.count_diff for stat in stats) / frames,
+        }
+
+
+def run_benchmarks(names, frames, alloc_frames, seed):
+    """Run the named scenarios and return the full result document."""
+    results = {
+        'meta': {
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'platform': platform.platform(),
+            'frames': frames,
+            'seed': seed,
+        },
+        'scenarios': {},
+    }
+    for name in names:
+        bench = Benchmark(name, seed)
+        result = bench.run(frames)
+        result['allocations'] = bench.measure_allocations(alloc_frames)
+        result['startup_ms'] = bench.ai.startup_report()
+        results['scenarios'][name] = result
+        bench.ai.scores.close()
+        pygame.display.quit()
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return a list of regressions beyond threshold compared with baseline."""
+    regressions = []
+    for name, result in results['scenarios'].items():
+        old = baseline.get('scenarios', {}).get(name)
+        if old is None:
+            continue
+        checks = [('frame_ms', key, result['frame_ms'][key], old['frame_ms'][key])
+                  for key in ('p50', 'p95', 'p99')]
+        checks += [(f'phases.{phase}', 'p95', result['phases'][phase]['p95'],
+                    old['phases'][phase]['p95']) for phase in PHASES
+                   if phase in old['phases']]
+        for metric, key, new_value, old_value in checks:
+            if old_value > 0 and new_value > old_value * (1 + threshold):
+                regressions.append(
+                    f"{name} {metric} {key}: {old_value:.3f} -> {new_value:.3f} ms "
+                    f"(+{(new_value / old_value - 1) * 100:.0f}%)")
+        if result['ticks_per_sec'] < old['ticks_per_sec'] * (1 - threshold):
+            regressions.append(
+                f"{name} ticks/sec: {old['ticks_per_sec']:.0f} -> {result['ticks_per_sec']:.0f}")
+    return regressions
+
+
+def print_report(results):
+    """Print a short table of the results."""
+    for name, result in results['scenarios'].items():
+        frame = result['frame_ms']
+        print(f"{name}: {result['ticks_per_sec']:,.0f} ticks/s, frame p50 {frame['p50']:.2f}"
+              f" p95 {frame['p95']:.2f} p99 {frame['p99']:.2f} ms,"
+              f" {result['allocations']['blocks_per_frame']:.1f} blocks/frame,"
+              f" fleet build max {result['fleet_build_ms']['max']:.2f} ms,"
+              f" quality {result['quality']['name']}")
+        for phase, times in result['phases'].items():
+            print(f"    {phase:<11} p50 {times['p50']:.3f}  p95 {times['p95']:.3f}"
+                  f"  p99 {times['p99']:.3f} ms")
+        hits = result['hit_sequences']
+        if hits is not None:
+            print(f"    ship hits   {hits['sequences']} sequences, {hits['frames']} frames,"
+                  f" max {hits['max_frame_ms']:.3f} ms, {hits['frames_over_budget']}"
+                  f" over the {hits['budget_ms']:.2f} ms budget")
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description="Benchmark Alien Invasion scenarios.")
+    parser.add_argument('scenarios', nargs='*', default=list(SCENARIOS),
+                        help="scenarios to run (default: all)")
+    parser.add_argument('--frames', type=int, default=600)
+    parser.add_argument('--alloc-frames', type=int, default=120)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help="write results as JSON to this file")
+    parser.add_argument('--baseline', help="compare against this JSON results file")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="allowed slowdown against the baseline, as a fraction")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.scenarios, args.frames, args.alloc_frames, args.seed)
+    print_report(results)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against the baseline.")
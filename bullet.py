@@ -9,26 +9,31 @@ class Bullet(Sprite):
         super().__init__()
         self.screen = ai_game.screen
         self.settings = ai_game.settings
-        
-        # Load the bullet image and set its rect attribue.
-        self.image = pygame.image.load(r"images\bullet.bmp")
+        self.ship = ai_game.ship
+
+        # Use the shared bullet image and set its rect attribue.
+        self.image = ai_game.assets.image('bullet')
         self.rect = self.image.get_rect()
 
         # Create a bullet rect at (0, 0) and then set correct positon.
         self.rect = pygame.Rect(0, 0, self.rect.width,
                                 self.rect.height)
-        self.rect.midtop = ai_game.ship.rect.midtop
+        self.reset()
+
+    def reset(self):
+        """Move the bullet back to the ship, ready to be fired again."""
+        self.rect.midtop = self.ship.rect.midtop
 
         # Store the bullet's position as float.
         self.y = float(self.rect.y)
 
-    def update(self):
-        """Move the bullet up the screen."""
+    def update(self, dt):
+        """Move the bullet up the screen for dt seconds."""
         # Update the exact position of the bullet.
-        self.y -= self.settings.bullet_speed
+        self.y -= self.settings.bullet_speed * dt
         # Update rect positon.
         self.rect.y = self.y
     
-    def draw_bullet(self):
-        """Draw the bullet to he screen"""
-        self.screen.blit(self.image, self.rect)
\ No newline at end of file
+    def draw_bullet(self, dy=0):
+        """Draw the bullet to he screen, dy pixels lower, and return the rect drawn."""
+        return self.screen.blit(self.image, self.rect.move(0, dy))
\ No newline at end of file
@@ -1,5 +1,7 @@
 import pygame.font
 
+from text_cache import get_font
+
 class Button:
     """A class to build buttons for the game."""
 
@@ -12,7 +14,7 @@ class Button:
         self.width, self.height = 200, 50
         self.button_color = (0, 255, 0)
         self.text_color = (255, 255, 255)
-        self.font = pygame.font.SysFont(None, 48)
+        self.font = get_font(None, 48)
 
         # Build the button's rect object and center it.
         self.rect = pygame.Rect(0, 0, self.width, self.height)
@@ -29,6 +31,8 @@ class Button:
         self.msg_image_rect.center = self.rect.center
 
     def draw_button(self):
+        """Draw the button and return the rect it covers."""
         # Draw blank button and then draw message.
         self.screen.fill(self.button_color, self.rect)
         self.screen.blit(self.msg_image, self.msg_image_rect)
+        return self.rect
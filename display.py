@@ -0,0 +1,180 @@
+import os
+import warnings
+
+import pygame
+
+MODES = ('window', 'scaled', 'integer')
+
+
+class GameDisplay:
+    """
+    The window, and the fixed-size surface the game draws into.
+
+    The game always draws at Settings.screen_width x screen_height, so
+    every coordinate stays the same whatever the display. How that
+    surface reaches the display depends on Settings.display_mode:
+
+    'window'  -- a plain window of exactly that size (fullscreen changes
+                 the video mode).
+    'scaled'  -- pygame.SCALED: SDL stretches the surface to the window
+                 on the GPU, keeping its shape with black bars.
+    'integer' -- pygame.SCALED too, but only by whole multiples, so pixels
+                 stay square; the game sits centered in a border.
+
+    If SDL can't make a renderer for the scaled modes, the display
+    falls back to 'window'.
+    """
+
+    def __init__(self, settings):
+        """Open the window the settings ask for."""
+        self.settings = settings
+        self.size = (settings.screen_width, settings.screen_height)
+        self.mode = settings.display_mode
+        if self.mode not in MODES:
+            raise ValueError(f"Unknown display mode {self.mode!r}.")
+        self.fullscreen = settings.fullscreen
+
+        # Where the game's surface sits in the window, and the whole
+        # multiple it's shown at in 'integer' mode.
+        self.offset = (0, 0)
+        self.scale = 1
+
+        # SDL reads the filter for scaled modes when the renderer is made.
+        os.environ['SDL_RENDER_SCALE_QUALITY'] = settings.scale_filter
+
+        self.window = None
+        self.surface = None
+        self._open()
+
+    def _open(self):
+        """Set the video mode, and find the surface the game draws into."""
+        if self.mode == 'integer':
+            window_size = self._integer_window_size()
+        else:
+            window_size = self.size
+
+        flags = pygame.FULLSCREEN if self.fullscreen else 0
+        if self.mode == 'window':
+            self.window = pygame.display.set_mode(window_size, flags | pygame.DOUBLEBUF)
+        else:
+            try:
+                with warnings.catch_warnings():
+                    # The software renderer still works; it's just slower.
+                    warnings.simplefilter('ignore')
+                    self.window = pygame.display.set_mode(window_size, flags | pygame.SCALED)
+            except pygame.error:
+                self.mode = 'window'
+                return self._open()
+
+        # The display surface object is kept across set_mode() calls, so
+        # the game can hold on to it; only 'integer' mode draws elsewhere.
+        if self.surface is None:
+            if self.mode == 'integer':
+                self.surface = pygame.Surface(self.size).convert(self.window)
+            else:
+                self.surface = self.window
+        if self.surface is not self.window:
+            window_width, window_height = self.window.get_size()
+            self.offset = ((window_width - self.size[0]) // 2,
+                           (window_height - self.size[1]) // 2)
+            self.window.fill(self.settings.border_color)
+
+    def _integer_window_size(self):
+        """
+        Return the SCALED window size that shows the game at a whole
+        multiple. Windowed, pygame already picks a whole multiple of the
+        game's size. Fullscreen, the window is the desktop divided by the
+        largest multiple that fits, which SDL scales back up exactly.
+        """
+        if not self.fullscreen:
+            self.scale = 1
+            return self.size
+        desktop_width, desktop_height = pygame.display.get_desktop_sizes()[0]
+        self.scale = max(1, min(desktop_width // self.size[0], desktop_height // self.size[1]))
+        return (max(self.size[0], desktop_width // self.scale),
+                max(self.size[1], desktop_height // self.scale))
+
+    def toggle_fullscreen(self):
+        """Switch between a window and fullscreen; the screen must be redrawn after."""
+        self.fullscreen = not self.fullscreen
+        # SDL resizes a scaled window in place; the other modes need a new video mode.
+        if self.mode == 'scaled':
+            try:
+                if pygame.display.toggle_fullscreen():
+                    return
+            except pygame.error:
+                pass
+        self._open()
+
+    def to_game(self, pos):
+        """Turn a mouse position in the window into game coordinates."""
+        return (pos[0] - self.offset[0], pos[1] - self.offset[1])
+
+    def flip(self):
+        """Show the whole game surface."""
+        if self.surface is not self.window:
+            self.window.blit(self.surface, self.offset)
+        pygame.display.flip()
+
+    def update(self, rects):
+        """Show the parts of the game surface inside rects."""
+        if self.surface is self.window:
+            pygame.display.update(rects)
+            return
+        moved = []
+        for rect in rects:
+            moved.append(self.window.blit(self.surface, rect.move(self.offset), rect))
+        pygame.display.update(moved)
+
+    def stats(self):
+        """Return how the game is being shown, as a dictionary."""
+        return {
+            'mode': self.mode,
+            'fullscreen': self.fullscreen,
+            'game_size': self.size,
+            'window_size': pygame.display.get_window_size(),
+            'offset': self.offset,
+            'scale': self.scale,
+        }
+
+
+if __name__ == '__main__':
+    # Time presenting a busy frame in each mode, against scaling the
+    # frame to 4K in software on the CPU.
+    import sys
+    from time import perf_counter
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    from settings import Settings
+
+    def time_frames(present, frames=120):
+        start = perf_counter()
+        for _ in range(frames):
+            present()
+        return (perf_counter() - start) / frames * 1000
+
+    budget = 1000 / 60
+    for mode in MODES:
+        # Each mode gets a fresh window.
+        pygame.display.quit()
+        pygame.display.init()
+        settings = Settings()
+        settings.display_mode = mode
+        display = GameDisplay(settings)
+        display.surface.fill((211, 211, 211))
+        pygame.draw.circle(display.surface, (255, 0, 0), (600, 400), 300)
+        flip_ms = time_frames(display.flip)
+        update_ms = time_frames(lambda: display.update([pygame.Rect(550, 350, 100, 100)]))
+        print(f"{mode} ({display.mode}): flip {flip_ms:.2f} ms, dirty update {update_ms:.3f} ms,"
+              f" window {display.stats()['window_size']}")
+
+    target = pygame.Surface((3840, 2160)).convert()
+    software_ms = time_frames(lambda: pygame.transform.scale(display.surface, (3840, 2160), target),
+                              frames=30)
+    print(f"Software scaling to 4K would add {software_ms:.2f} ms a frame"
+          f" ({software_ms / budget:.0%} of the 60 FPS budget).")
+
+    # Mouse positions map back to the game's own coordinates.
+    display.offset = (360, 140)
+    if display.to_game((960, 540)) != (600, 400):
+        sys.exit("Window positions don't map back to the game.")
+    pygame.quit()
@@ -0,0 +1,235 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def numpy_available():
+    """Return True if NumPy can be used for the fleet."""
+    return np is not None
+
+
+class Fleet:
+    """
+    A fleet of aliens stored as NumPy position arrays.
+
+    Moving, edge checks, dropping and collision tests work on the whole
+    fleet at once. The Alien sprites are only a view for drawing; call
+    sync_sprites() before drawing them.
+    """
+
+    def __init__(self, ai_game, capacity=64):
+        """Initialize empty position arrays."""
+        self.settings = ai_game.settings
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.sprites = []
+        self.alien_width = 0
+        self.alien_height = 0
+
+        # Alien indices bucketed by grid cell, and how far the fleet has
+        # moved since; None until rebuild_grid() is called.
+        self.cells = None
+        self.cell_size = 64
+        self.grid_x = 0.0
+        self.grid_y = 0
+
+    def __len__(self):
+        """Return the number of living aliens."""
+        return int(np.count_nonzero(self.alive[:len(self.sprites)]))
+
+    def clear(self):
+        """Remove every alien from the fleet."""
+        for alien in self.sprites:
+            alien.fleet_index = None
+        self.sprites = []
+        self.alive[:] = False
+        self.cells = None
+
+    def add(self, alien):
+        """Add an alien at its current position."""
+        index = len(self.sprites)
+        if index == len(self.x):
+            self._grow()
+
+        self.x[index] = alien.x
+        self.y[index] = alien.rect.y
+        self.alive[index] = True
+        self.alien_width, self.alien_height = alien.rect.size
+
+        alien.fleet_index = index
+        self.sprites.append(alien)
+
+    def add_many(self, aliens, xs, ys):
+        """Add a list of aliens at the given positions in one go."""
+        start = len(self.sprites)
+        end = start + len(aliens)
+        while end > len(self.x):
+            self._grow()
+
+        self.x[start:end] = xs
+        self.y[start:end] = ys
+        self.alive[start:end] = True
+        if aliens:
+            self.alien_width, self.alien_height = aliens[0].rect.size
+
+        for index, alien in enumerate(aliens, start):
+            alien.fleet_index = index
+        self.sprites.extend(aliens)
+
+    def _grow(self):
+        """Double the size of the arrays."""
+        extra = len(self.x)
+        self.x = np.concatenate((self.x, np.zeros(extra)))
+        self.y = np.concatenate((self.y, np.zeros(extra)))
+        self.alive = np.concatenate((self.alive, np.zeros(extra, dtype=bool)))
+
+    def kill(self, alien):
+        """Mark an alien as destroyed."""
+        self.alive[alien.fleet_index] = False
+
+    def update(self, dt):
+        """Move the whole fleet to the right or left for dt seconds."""
+        count = len(self.sprites)
+        step = (self.settings.alien_speed * self.settings.wave_speed
+                * self.settings.fleet_direction * dt)
+        self.x[:count] += step
+        self.grid_x += step
+
+    def drop(self):
+        """Drop the whole fleet down."""
+        count = len(self.sprites)
+        self.y[:count] += self.settings.fleet_drop_speed
+        self.grid_y += self.settings.fleet_drop_speed
+
+    def check_edges(self):
+        """Return True if any living alien is at the edge of the screen."""
+        left = self.lefts()[self.living()]
+        if not len(left):
+            return False
+        return bool(left.max() + self.alien_width >= self.settings.screen_width
+                    or left.min() <= 0)
+
+    def bottom_reached(self):
+        """Return True if any living alien has reached the bottom of the screen."""
+        top = self.y[:len(self.sprites)][self.living()]
+        return bool(len(top) and
+                    top.max() + self.alien_height >= self.settings.screen_height)
+
+    def rebuild_grid(self, cell_size):
+        """
+        Bucket every alien by the grid cells it covers, so collide_rect()
+        only tests the aliens near a rect. The fleet moves as one, so
+        update() and drop() shift later queries instead of re-bucketing.
+        """
+        self.cell_size = cell_size
+        self.grid_x = 0.0
+        self.grid_y = 0
+        left = self.lefts().astype(int)
+        top = self.y[:len(self.sprites)].astype(int)
+        first_x, last_x = left // cell_size, (left + self.alien_width - 1) // cell_size
+        first_y, last_y = top // cell_size, (top + self.alien_height - 1) // cell_size
+
+        # Pair every alien with each cell it covers, then group by cell.
+        cell_xs, cell_ys, indices = [], [], []
+        index = np.arange(len(left))
+        for step_x in range(int((last_x - first_x).max(initial=0)) + 1):
+            for step_y in range(int((last_y - first_y).max(initial=0)) + 1):
+                covers = (first_x + step_x <= last_x) & (first_y + step_y <= last_y)
+                cell_xs.append(first_x[covers] + step_x)
+                cell_ys.append(first_y[covers] + step_y)
+                indices.append(index[covers])
+        cell_xs, cell_ys = np.concatenate(cell_xs), np.concatenate(cell_ys)
+        indices = np.concatenate(indices)
+        order = np.lexsort((indices, cell_ys, cell_xs))
+        cell_xs, cell_ys, indices = cell_xs[order], cell_ys[order], indices[order]
+        starts = np.flatnonzero(np.diff(cell_xs, prepend=cell_xs[:1] - 1)
+                                | np.diff(cell_ys, prepend=cell_ys[:1] - 1))
+        self.cells = {
+            (cell_x, cell_y): bucket for cell_x, cell_y, bucket in
+            zip(cell_xs[starts].tolist(), cell_ys[starts].tolist(), np.split(indices, starts[1:]))
+        }
+
+    def collide_rect(self, rect):
+        """Return the living aliens overlapping rect, in fleet order."""
+        return self.collide_rects([rect])[0]
+
+    def collide_rects(self, rects):
+        """
+        Return a list for each rect of the living aliens overlapping it,
+        in fleet order. With the grid built, every rect is tested in one
+        go against only the aliens in the cells it covers.
+        """
+        if self.cells is not None:
+            return self._collide_grid(rects)
+        left = self.lefts()
+        top = self.y[:len(self.sprites)]
+        living = self.living()
+        found = []
+        for rect in rects:
+            hits = self._overlapping(left, top, living, rect.left, rect.top,
+                                     rect.right, rect.bottom)
+            found.append([self.sprites[index] for index in np.flatnonzero(hits)])
+        return found
+
+    def _collide_grid(self, rects):
+        """Like collide_rects(), testing only the aliens near each rect."""
+        # Look up where each rect was relative to the aliens when they were
+        # bucketed, padded a pixel each way for rounding of their lefts.
+        shift_x, shift_y = round(self.grid_x), round(self.grid_y)
+        size = self.cell_size
+        buckets, owners = [], []
+        for number, rect in enumerate(rects):
+            local_rect = rect.move(-shift_x, -shift_y).inflate(2, 2)
+            for cell_x in range(local_rect.left // size, (local_rect.right - 1) // size + 1):
+                for cell_y in range(local_rect.top // size, (local_rect.bottom - 1) // size + 1):
+                    bucket = self.cells.get((cell_x, cell_y))
+                    if bucket is not None:
+                        buckets.append(bucket)
+                        owners.append(number)
+        found = [[] for _ in rects]
+        if not buckets:
+            return found
+
+        # Pair each rect with the aliens near it. An alien covering several
+        # cells is in several buckets, so drop the repeats; sorting the
+        # pairs keeps each rect's aliens in fleet order.
+        count = len(self.sprites)
+        owner = np.repeat(owners, [len(bucket) for bucket in buckets])
+        owner, index = np.divmod(np.unique(owner * count + np.concatenate(buckets)), count)
+
+        bounds = np.array([(rect.left, rect.top, rect.right, rect.bottom) for rect in rects])
+        x = self.x[index]
+        left = np.copysign(np.floor(np.abs(x) + 0.5), x)
+        hits = self._overlapping(left, self.y[index], self.alive[index], *bounds[owner].T)
+        for number, alien in zip(owner[hits].tolist(), index[hits].tolist()):
+            found[number].append(self.sprites[alien])
+        return found
+
+    def _overlapping(self, left, top, alive, rect_left, rect_top, rect_right, rect_bottom):
+        """Return a mask of the living aliens at left, top that overlap the rect edges."""
+        return (alive
+                & (left < rect_right) & (left + self.alien_width > rect_left)
+                & (top < rect_bottom) & (top + self.alien_height > rect_top))
+
+    def sync_sprite(self, alien):
+        """Copy one alien's position from the arrays to its sprite."""
+        index = alien.fleet_index
+        alien.x = float(self.x[index])
+        alien.rect.x = alien.x
+        alien.rect.y = int(self.y[index])
+
+    def sync_sprites(self):
+        """Copy the positions of all living aliens to their sprites."""
+        for index in np.flatnonzero(self.living()):
+            self.sync_sprite(self.sprites[index])
+
+    def living(self):
+        """Return the alive mask for the aliens in use."""
+        return self.alive[:len(self.sprites)]
+
+    def lefts(self):
+        """Return the whole-pixel left edges, rounded the way Rect rounds them."""
+        x = self.x[:len(self.sprites)]
+        return np.copysign(np.floor(np.abs(x) + 0.5), x)
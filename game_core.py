@@ -0,0 +1,431 @@
+from random import Random
+from time import perf_counter
+
+import pygame
+
+from settings import Settings
+from game_stats import GameStats
+from assets import AssetRegistry
+from ship import Ship
+from bullet import Bullet
+from alien import Alien
+from fleet import Fleet, numpy_available
+from spatial_hash import SpatialHash
+from pool import SpritePool
+from waves import load_waves
+
+
+class TickInput:
+    """The player's input for a single simulation tick."""
+
+    def __init__(self, move_left=False, move_right=False, fire=False):
+        """Initialize the input flags."""
+        self.move_left = move_left
+        self.move_right = move_right
+        self.fire = fire
+
+
+class GameCore:
+    """
+    The rules of Alien Invasion, advanced one tick at a time.
+
+    The core never touches the display, the clock or the event queue, so
+    it runs just as well under the SDL dummy drivers as in a window.
+    """
+
+    def __init__(self, settings=None, screen=None, assets=None, seed=None):
+        """Initialize the game state."""
+        self.settings = settings if settings is not None else Settings()
+
+        # All randomness comes from here, so a seed replays a game exactly.
+        self.rng = Random(seed)
+
+        # Sprites only need a surface for its size, so headless games use
+        # a plain Surface instead of the display.
+        if screen is None:
+            screen = pygame.Surface(
+                (self.settings.screen_width, self.settings.screen_height))
+        self.screen = screen
+        self.assets = assets if assets is not None else AssetRegistry()
+
+        self.stats = GameStats(self)
+        self.ship = Ship(self)
+        self.bullets = pygame.sprite.Group()
+        self.aliens = pygame.sprite.Group()
+
+        # Bullets and aliens are reused from pools instead of rebuilt.
+        self.bullet_pool = SpritePool(lambda: Bullet(self), self.settings.bullets_allowed)
+        self.alien_pool = SpritePool(lambda: Alien(self), self.settings.alien_pool_size)
+
+        # With NumPy the fleet moves as arrays and self.aliens is just a view.
+        self.fleet = None
+        if self.settings.fleet_engine == 'numpy' and numpy_available():
+            self.fleet = Fleet(self)
+        self.spatial_hash = SpatialHash(self.settings.collision_cell_size)
+
+        self.game_active = False
+        self.ticks = 0
+
+        # Every tick is the same length, so games play out the same at any
+        # frame rate.
+        self.dt = 1 / self.settings.tick_rate
+
+        # How far the fleet and the bullets moved in the last tick, so the
+        # shell can draw them between ticks.
+        self.alien_step = 0.0
+        self.bullet_step = 0.0
+
+        # How far the whole fleet has moved since it was created, and a
+        # count that goes up whenever aliens join or leave it, so drawing
+        # can cache the fleet's picture while it only moves. fleet_number
+        # goes up only when the whole fleet is replaced.
+        self.fleet_x = 0.0
+        self.fleet_y = 0
+        self.fleet_version = 0
+        self.fleet_number = 0
+
+        # Ticks left in the respawn pause and in the new ship's invulnerability.
+        self.respawn_ticks = 0
+        self.invulnerable_ticks = 0
+
+        # Things that happened during the last tick, for the shell to show.
+        self.events = []
+
+        # A FrameProfiler to time the tick's phases, or None.
+        self.profiler = None
+
+        # Each level's fleet comes from a wave in Settings.wave_file.
+        self.waves = load_waves(self.settings.wave_file)
+        self.wave = None
+        self.wave_stats = []
+
+        self._create_fleet()
+
+    def start_game(self, seed=None):
+        """
+        Resets all statistics bullets , aliens ; create new fleet
+        and center the ship. Pass a seed to make the game repeatable.
+        """
+        if seed is not None:
+            self.rng.seed(seed)
+
+        # Reset the game statisitcs.
+        self.stats.reset_stats()
+        self.wave_stats = []
+        self.game_active = True
+        self.ticks = 0
+        self.respawn_ticks = 0
+        self.invulnerable_ticks = 0
+
+        # Get rid of any remaining bullets and aliens.
+        self.bullet_pool.release_all(self.bullets)
+        self._empty_fleet()
+
+        # Create a new fleet and center the ship .
+        self._create_fleet()
+        self.ship.center_ship()
+
+        #Reset the game settings.
+        self.settings.initialize_dynamic_settings()
+
+    def step(self, inputs):
+        """Advance the game by one tick and return what happened."""
+        self.events = []
+        if not self.game_active:
+            return self.events
+
+        self.ticks += 1
+
+        # Everything holds still while the ship explodes.
+        if self.respawn_ticks:
+            self.alien_step = 0.0
+            self.bullet_step = 0.0
+            self.respawn_ticks -= 1
+            if not self.respawn_ticks:
+                self._respawn_ship()
+            return self.events
+
+        if self.invulnerable_ticks:
+            self.invulnerable_ticks -= 1
+
+        self.ship.moving_left = inputs.move_left
+        self.ship.moving_right = inputs.move_right
+        if inputs.fire:
+            self._fire_bullet()
+
+        profiler = self.profiler
+        if profiler is None:
+            self.ship.update(self.dt)
+            self._update_bullets()
+            self._update_aliens()
+        else:
+            start = profiler.start()
+            self.ship.update(self.dt)
+            profiler.stop('ship', start)
+            start = profiler.start()
+            self._update_bullets()
+            profiler.stop('bullets', start)
+            start = profiler.start()
+            self._update_aliens()
+            profiler.stop('aliens', start)
+        return self.events
+
+    def _fire_bullet(self):
+        """Create a new bullet and add it to the bullets group."""
+        if len(self.bullets) < self.settings.bullets_allowed:
+            new_bullet = self.bullet_pool.acquire()
+            self.bullets.add(new_bullet)
+
+    def _update_bullets(self):
+        """Update the position of bullets and get rid of old bullets."""
+        # Update bullet positons.
+        self.bullet_step = self.settings.bullet_speed * self.dt
+        self.bullets.update(self.dt)
+
+        # Get rid of bullets that have disappeared, reading the group's
+        # sprites directly rather than copying the group.
+        offscreen = [bullet for bullet in self.bullets.spritedict
+                     if bullet.rect.bottom <= 0]
+        for bullet in offscreen:
+            self.bullet_pool.release(bullet)
+
+        self._check_bullet_alien_collisions()
+
+    def _check_bullet_alien_collisions(self):
+        """Respond to bullet-alien collisions."""
+        # Remove any bullets and aliens that have collided.
+        if self.fleet is not None:
+            collisions = self._fleet_collisions()
+        elif self.settings.collision_mode == 'grid':
+            collisions = self.spatial_hash.groupcollide(self.bullets, self.aliens)
+        else:
+            collisions = pygame.sprite.groupcollide(self.bullets, self.aliens, True, True)
+
+        if collisions:
+            destroyed = []
+            for bullet, aliens in collisions.items():
+                self.stats.score += (round(self.settings.alien_points * self.settings.wave_points)
+                                     * len(aliens))
+                destroyed.extend(alien.rect.center for alien in aliens)
+                self.bullet_pool.release(bullet)
+                self.alien_pool.release_all(aliens)
+            self.fleet_version += 1
+            if self.stats.score > self.stats.high_score:
+                self.stats.high_score = self.stats.score
+            self.events.append(('aliens_destroyed', destroyed))
+
+        if not self.aliens:
+            # Destroy existing bullets and create new fleet.
+            self.bullet_pool.release_all(self.bullets)
+            self._empty_fleet()
+            self.settings.increase_speed()
+
+            # Increase level, and bring in the new level's wave.
+            self.stats.level += 1
+            self._create_fleet()
+            self.events.append(('level_up',))
+
+    def _fleet_collisions(self):
+        """Collide bullets with the array fleet, like groupcollide does."""
+        collisions = {}
+        bullets = self.bullets.sprites()
+        destroyed = set()
+        for bullet, aliens in zip(bullets, self.fleet.collide_rects(
+                [bullet.rect for bullet in bullets])):
+            # An earlier bullet this tick may have destroyed some already.
+            aliens = [alien for alien in aliens if alien not in destroyed]
+            if aliens:
+                destroyed.update(aliens)
+                for alien in aliens:
+                    self.fleet.kill(alien)
+                    self.fleet.sync_sprite(alien)
+                    alien.kill()
+                bullet.kill()
+                collisions[bullet] = aliens
+        return collisions
+
+    def pool_stats(self):
+        """Return the bullet and alien pool statistics."""
+        return {
+            'bullets': self.bullet_pool.stats(),
+            'aliens': self.alien_pool.stats(),
+        }
+
+    def sync_fleet(self):
+        """Bring the alien sprites up to date before they are drawn."""
+        if self.fleet is not None:
+            self.fleet.sync_sprites()
+
+    def _empty_fleet(self):
+        """Remove every alien."""
+        self.alien_pool.release_all(self.aliens)
+        if self.fleet is not None:
+            self.fleet.clear()
+        self.fleet_version += 1
+        self.fleet_number += 1
+
+    def _create_fleet(self):
+        """Create the fleet of aliens for the current level's wave."""
+        start = perf_counter()
+        wave = self._set_wave()
+        alien_size = self.assets.image('alien').get_size()
+        if wave.formation == 'classic':
+            self._create_classic_fleet(*alien_size)
+        else:
+            screen_size = (self.settings.screen_width, self.settings.screen_height)
+            self._create_aliens(*self.waves.layout(wave, screen_size, alien_size))
+
+        self.fleet_x = 0.0
+        self.fleet_y = 0
+        self.fleet_version += 1
+
+        self._bucket_fleet()
+
+        self.wave_stats.append({
+            'level': self.stats.level,
+            'wave': wave.name,
+            'aliens': len(self.aliens),
+            'build_ms': (perf_counter() - start) * 1000,
+        })
+
+    def _bucket_fleet(self):
+        """Bucket the fleet for the grid broadphase, if collision_mode is 'grid'."""
+        # The fleet moves as one, so it is bucketed only once per fleet.
+        if self.settings.collision_mode != 'grid':
+            return
+        if self.fleet is not None:
+            self.fleet.rebuild_grid(self.settings.collision_cell_size)
+        else:
+            self.spatial_hash.rebuild(self.aliens.sprites())
+
+    def _set_wave(self):
+        """Pick the current level's wave and apply its speed and points."""
+        self.wave = self.waves.wave_for(self.stats.level, self.settings.wave_override)
+        self.settings.wave_speed = self.wave.speed
+        self.settings.wave_points = self.wave.points
+        return self.wave
+
+    def _create_classic_fleet(self, alien_width, alien_height):
+        """Create a fleet in rows with random gaps."""
+        current_x, current_y = alien_width, alien_height
+        while current_y < (self.settings.screen_height - 8 * alien_height):
+            while current_x < (self.settings.screen_width - 2 * alien_width):
+                self._create_alien(current_x, current_y)
+                current_x += self.rng.uniform(1, 1.9) * alien_width
+
+            # Finished a row, reset x value, and increment y value.
+            current_x = alien_width + self.rng.uniform(0, 8)
+            current_y += self.rng.uniform(1, 1.9) * alien_width
+
+    def _create_alien(self, x_position, y_position):
+        """Create an alien and place it in the row."""
+        new_alien = self.alien_pool.acquire(x_position, y_position)
+        self.aliens.add(new_alien)
+        if self.fleet is not None:
+            self.fleet.add(new_alien)
+
+    def _create_aliens(self, xs, ys):
+        """Create a whole fleet from position lists in one go."""
+        aliens = self.alien_pool.acquire_many(zip(xs, ys))
+        self.aliens.add(aliens)
+        if self.fleet is not None:
+            self.fleet.add_many(aliens, xs, ys)
+
+    def _update_aliens(self):
+        """Check if the fleet is at an edge, then update positions."""
+        if self.fleet is not None:
+            self._update_fleet_arrays()
+            return
+
+        self._check_fleet_edges()
+        self.aliens.update(self.dt)
+        self.alien_step = (self.settings.alien_speed * self.settings.wave_speed
+                           * self.settings.fleet_direction * self.dt)
+        self.fleet_x += self.alien_step
+        self.spatial_hash.move(self.alien_step, 0)
+
+        # Look for alien-ship collisions.
+        if pygame.sprite.spritecollideany(self.ship, self.aliens):
+            self._ship_hit()
+
+        # Look for aliens hitting the bottom of the screen.
+        self._check_aliens_bottom()
+
+    def _update_fleet_arrays(self):
+        """Move the array fleet and check it against the ship and the bottom."""
+        if self.fleet.check_edges():
+            self._change_fleet_direction()
+        self.fleet.update(self.dt)
+        self.alien_step = (self.settings.alien_speed * self.settings.wave_speed
+                           * self.settings.fleet_direction * self.dt)
+        self.fleet_x += self.alien_step
+
+        if self.fleet.collide_rect(self.ship.rect):
+            self._ship_hit()
+
+        if self.fleet.bottom_reached():
+            self._ship_hit()
+
+    def _check_fleet_edges(self):
+        """Respond appropriately if any aliens have reached an edge."""
+        for alien in self.aliens.sprites():
+            if alien.check_edges():
+                self._change_fleet_direction()
+                break
+
+    def _change_fleet_direction(self):
+        """Droop the entire fleet and change the fleet's direction."""
+        if self.fleet is not None:
+            self.fleet.drop()
+        else:
+            for alien in self.aliens.sprites():
+                alien.rect.y += self.settings.fleet_drop_speed
+            self.spatial_hash.move(0, self.settings.fleet_drop_speed)
+        self.fleet_y += self.settings.fleet_drop_speed
+        self.settings.fleet_direction *= -1
+
+    @property
+    def ship_respawning(self):
+        """Return True while the game is paused for a lost ship."""
+        return self.respawn_ticks > 0
+
+    def _ship_hit(self):
+        """Respond to the ship being hit by an alien."""
+        # A ship can only be lost once, even if it's hit twice in one tick.
+        if not self.game_active or self.respawn_ticks or self.invulnerable_ticks:
+            return
+
+        self.events.append(('ship_hit', self.ship.rect.copy()))
+
+        # Decrement ships_left.
+        if self.stats.ships_left > 0:
+            self.stats.ships_left -= 1
+
+            # Pause while the ship explodes; _respawn_ship() carries on.
+            self.respawn_ticks = max(
+                1, round(self.settings.ship_respawn_time * self.settings.tick_rate))
+        else:
+            self.game_active = False
+            self.events.append(('game_over',))
+
+    def _respawn_ship(self):
+        """Bring in a new fleet and ship after the respawn pause."""
+        # Get rid of any remaining aliens and bullets.
+        self._empty_fleet()
+        self.bullet_pool.release_all(self.bullets)
+
+        # Create a new fleet and center the ship.
+        self._create_fleet()
+        self.ship.center_ship()
+
+        self.invulnerable_ticks = round(
+            self.settings.ship_invulnerable_time * self.settings.tick_rate)
+        self.events.append(('ship_respawned',))
+
+    def _check_aliens_bottom(self):
+        """Check if any aliens have reached the bottom of the screen."""
+        for alien in self.aliens.sprites():
+            if alien.rect.bottom >= self.settings.screen_height:
+                # Treat this same as if the ship got hit.
+                self._ship_hit()
+                break
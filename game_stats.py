@@ -5,7 +5,8 @@ class GameStats:
         """Initialize statistics."""
         self.settings = ai_game.settings
         self.reset_stats()
-        # Read high score from file
+        # High score left by versions before the score store; the game
+        # raises it to the store's best.
         self.high_score = self._read_high_score()
 
     def reset_stats(self):
@@ -22,8 +23,3 @@ class GameStats:
                 return int(high_score) if high_score else 0
         except (FileNotFoundError, ValueError):
             return 0
-
-    def _write_high_score(self):
-        """Write the high score to a file."""
-        with open('high_score.txt', 'w') as file:
-            file.write(str(self.high_score))
\ No newline at end of file
@@ -0,0 +1,112 @@
+from collections import deque
+
+# Quality tiers, best first. Each says how often explosions animate and
+# the HUD is redrawn (every N frames), how many explosions one volley
+# may start and how many explosion sounds may play at once, and how many
+# frames the fleet's picture may lag behind the aliens it shows.
+TIERS = (
+    {'name': 'full', 'explosion_every': 1, 'explosions_per_volley': 100,
+     'explosion_voices': 4, 'hud_every': 1, 'fleet_every': 1},
+    {'name': 'reduced', 'explosion_every': 2, 'explosions_per_volley': 8,
+     'explosion_voices': 2, 'hud_every': 2, 'fleet_every': 2},
+    {'name': 'low', 'explosion_every': 3, 'explosions_per_volley': 4,
+     'explosion_voices': 1, 'hud_every': 4, 'fleet_every': 4},
+    {'name': 'minimal', 'explosion_every': 4, 'explosions_per_volley': 1,
+     'explosion_voices': 1, 'hud_every': 8, 'fleet_every': 8},
+)
+
+
+class QualityGovernor:
+    """
+    Trade visual quality for frame time when frames run over budget.
+
+    Every window frames the governor takes the 90th percentile of those
+    frames' work times, so a few slow frames count as much as a slow
+    average. Over degrade_at of the frame budget, it drops a tier; under
+    restore_at for restore_windows windows in a row, it climbs back one.
+    If frames go over budget again right after a climb, the climb was
+    too soon, and the governor waits twice as long before the next one.
+    """
+
+    def __init__(self, settings, window=30, degrade_at=0.9, restore_at=0.5,
+                 restore_windows=2):
+        """Start at full quality."""
+        self.enabled = settings.adaptive_quality
+        self.budget_ms = 1000 / (settings.frame_rate or settings.tick_rate)
+        self.window = window
+        self.degrade_at = degrade_at
+        self.restore_at = restore_at
+        self.restore_windows = restore_windows
+        self.calm_windows = 0
+        self.just_restored = False
+
+        self.tier = 0
+        self.quality = TIERS[0]
+        self.frames = 0
+        self.frame_times = []
+        self.load_ms = 0.0
+
+        # Counters for stats(): frames spent in each tier, and the most
+        # recent changes as (frame, old tier, new tier, 90th percentile ms).
+        self.tier_frames = [0] * len(TIERS)
+        self.changes = deque(maxlen=20)
+
+    def due(self, key):
+        """Return True if work done every quality[key] frames is due this frame."""
+        return self.frames % self.quality[key] == 0
+
+    def end_frame(self, frame_ms):
+        """Record a frame's work time; return True if the tier changed."""
+        self.frames += 1
+        self.tier_frames[self.tier] += 1
+        if not self.enabled:
+            return False
+
+        self.frame_times.append(frame_ms)
+        if len(self.frame_times) < self.window:
+            return False
+        ordered = sorted(self.frame_times)
+        self.load_ms = ordered[int(len(ordered) * 0.9)]
+        self.frame_times = []
+        just_restored = self.just_restored
+        self.just_restored = False
+
+        if self.load_ms > self.budget_ms * self.degrade_at:
+            self.calm_windows = 0
+            if self.tier == len(TIERS) - 1:
+                return False
+            if just_restored:
+                self.restore_windows = min(self.restore_windows * 2, 64)
+            self.set_tier(self.tier + 1, self.load_ms)
+            return True
+
+        if self.load_ms < self.budget_ms * self.restore_at and self.tier > 0:
+            self.calm_windows += 1
+            if self.calm_windows >= self.restore_windows:
+                self.calm_windows = 0
+                self.just_restored = True
+                self.set_tier(self.tier - 1, self.load_ms)
+                return True
+        else:
+            self.calm_windows = 0
+        return False
+
+    def set_tier(self, tier, load_ms=0.0):
+        """Switch to a quality tier."""
+        self.changes.append((self.frames, self.tier, tier, load_ms))
+        self.tier = tier
+        self.quality = TIERS[tier]
+
+    def stats(self):
+        """Return the current tier and the governor's history as a dictionary."""
+        return {
+            'tier': self.tier,
+            'name': self.quality['name'],
+            'budget_ms': self.budget_ms,
+            'load_ms': self.load_ms,
+            'restore_windows': self.restore_windows,
+            'frames': self.frames,
+            'tier_frames': {tier['name']: frames
+                            for tier, frames in zip(TIERS, self.tier_frames)},
+            'changes': list(self.changes),
+        }
@@ -0,0 +1,124 @@
+from collections import deque
+from time import perf_counter
+
+import pygame
+
+from game_core import TickInput
+
+MOVE_LEFT_KEYS = (pygame.K_LEFT, pygame.K_a)
+MOVE_RIGHT_KEYS = (pygame.K_RIGHT, pygame.K_d)
+FIRE_KEYS = (pygame.K_SPACE, pygame.K_UP)
+GAME_KEYS = MOVE_LEFT_KEYS + MOVE_RIGHT_KEYS + FIRE_KEYS
+
+# The only events the game reads; SDL drops every other kind.
+EVENT_TYPES = (pygame.QUIT, pygame.KEYDOWN, pygame.KEYUP, pygame.MOUSEBUTTONDOWN,
+               pygame.WINDOWFOCUSLOST, pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED)
+
+
+class InputHandler:
+    """
+    Turn key events into one TickInput per tick.
+
+    Key events only update which keys are held. Each tick samples them
+    once: movement follows the held keys, and fire repeats at
+    Settings.fire_rate while a fire key is held. A tap between ticks
+    still fires on the next tick the fire rate allows.
+
+    Every input is timestamped when its event is read, and again when
+    the first frame after the tick that used it reaches the display;
+    the gap is the input-to-display latency.
+    """
+
+    def __init__(self, settings, window=240):
+        """Start with no keys held."""
+        self.settings = settings
+        self.held = set()
+        self.fire_tapped = False
+        self.cooldown = 0
+
+        # When the oldest input not yet used by a tick was read, and the
+        # read times of inputs used by a tick but not yet shown.
+        self.pending_since = None
+        self.awaiting_display = []
+        self.latencies = deque(maxlen=window)
+
+    def restrict_events(self):
+        """Only let the event types the game uses into the queue."""
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(EVENT_TYPES)
+
+    def key_down(self, key, playing=True):
+        """
+        Note a pressed key; return True if it's one of the game's keys.
+        Keys pressed while no game is playing aren't timed for latency.
+        """
+        if key not in GAME_KEYS:
+            return False
+        self.held.add(key)
+        if key in FIRE_KEYS:
+            self.fire_tapped = True
+        if playing:
+            self._stamp()
+        return True
+
+    def key_up(self, key, playing=True):
+        """Note a released key; return True if it's one of the game's keys."""
+        if key not in GAME_KEYS:
+            return False
+        self.held.discard(key)
+        if playing:
+            self._stamp()
+        return True
+
+    def release_all(self):
+        """Let go of every key, as when the window loses focus."""
+        self.held.clear()
+        self.fire_tapped = False
+        # Inputs that were never used by a tick have nothing to time.
+        self.pending_since = None
+        self.awaiting_display.clear()
+
+    def reset(self):
+        """Forget held keys and the fire cooldown, for a new game."""
+        self.release_all()
+        self.cooldown = 0
+
+    def _stamp(self):
+        """Remember when the oldest unused input arrived."""
+        if self.pending_since is None:
+            self.pending_since = perf_counter()
+
+    def tick_input(self):
+        """Sample the held keys into the TickInput for one tick."""
+        held = self.held
+        move_left = any(key in held for key in MOVE_LEFT_KEYS)
+        move_right = any(key in held for key in MOVE_RIGHT_KEYS)
+
+        fire = False
+        if self.cooldown:
+            self.cooldown -= 1
+        if not self.cooldown and (self.fire_tapped or any(key in held for key in FIRE_KEYS)):
+            fire = True
+            self.fire_tapped = False
+            self.cooldown = max(1, round(self.settings.tick_rate / self.settings.fire_rate))
+
+        if self.pending_since is not None:
+            self.awaiting_display.append(self.pending_since)
+            self.pending_since = None
+        return TickInput(move_left, move_right, fire)
+
+    def frame_presented(self):
+        """Record the latency of every input the frame just shown reflects."""
+        if self.awaiting_display:
+            now = perf_counter()
+            self.latencies.extend((now - start) * 1000 for start in self.awaiting_display)
+            self.awaiting_display.clear()
+
+    def latency_stats(self):
+        """Return p50, p95 and max input-to-display latency in milliseconds."""
+        ordered = sorted(self.latencies)
+        if not ordered:
+            return 0.0, 0.0, 0.0
+        return (ordered[len(ordered) // 2],
+                ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                ordered[-1])
@@ -0,0 +1,33 @@
+import pygame
+
+from text_cache import get_font
+
+class LoadingScreen:
+    """A class to show progress while the game's assets load."""
+
+    def __init__(self, ai_game):
+        """Prepare the message and the progress bar."""
+        self.screen = ai_game.screen
+        self.screen_rect = self.screen.get_rect()
+        self.bg_color = ai_game.settings.bg_color
+
+        self.text_color = (30, 30, 30)
+        self.bar_color = (0, 255, 0)
+        self.font = get_font(None, 48)
+        self.msg_image = self.font.render("Loading...", True, self.text_color, self.bg_color)
+        self.msg_image_rect = self.msg_image.get_rect()
+        self.msg_image_rect.midbottom = (self.screen_rect.centerx, self.screen_rect.centery - 10)
+
+        # The bar's outline; the filled part grows inside it.
+        self.bar_rect = pygame.Rect(0, 0, 300, 20)
+        self.bar_rect.midtop = (self.screen_rect.centerx, self.screen_rect.centery + 10)
+
+    def draw(self, progress):
+        """Draw the message and a bar filled to progress, from 0 to 1."""
+        self.screen.fill(self.bg_color)
+        self.screen.blit(self.msg_image, self.msg_image_rect)
+
+        filled = self.bar_rect.copy()
+        filled.width = round(self.bar_rect.width * min(max(progress, 0.0), 1.0))
+        self.screen.fill(self.bar_color, filled)
+        pygame.draw.rect(self.screen, self.text_color, self.bar_rect, 2)
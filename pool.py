@@ -0,0 +1,74 @@
+class SpritePool:
+    """
+    A pool of sprites that are reset and reused instead of rebuilt.
+
+    The pool calls factory() to make a sprite when it has none free, and
+    sprite.reset(*args) every time one is handed out.
+    """
+
+    def __init__(self, factory, capacity=0):
+        """Build capacity sprites up front."""
+        self.factory = factory
+        self.free = [factory() for _ in range(capacity)]
+
+        # Counters for stats().
+        self.created = capacity
+        self.acquired = 0
+        self.reused = 0
+        self.in_use = 0
+        self.high_water = 0
+
+    def acquire(self, *args):
+        """Return a sprite reset with args, reusing a free one if there is one."""
+        if self.free:
+            sprite = self.free.pop()
+            self.reused += 1
+        else:
+            sprite = self.factory()
+            self.created += 1
+        sprite.reset(*args)
+
+        self.acquired += 1
+        self.in_use += 1
+        self.high_water = max(self.high_water, self.in_use)
+        return sprite
+
+    def acquire_many(self, args_list):
+        """Return a list of sprites, one reset with each tuple of args."""
+        args_list = list(args_list)
+        count = len(args_list)
+        reused = min(count, len(self.free))
+        while len(self.free) < count:
+            self.free.append(self.factory())
+            self.created += 1
+
+        sprites = self.free[len(self.free) - count:]
+        del self.free[len(self.free) - count:]
+        for sprite, args in zip(sprites, args_list):
+            sprite.reset(*args)
+
+        self.reused += reused
+        self.acquired += count
+        self.in_use += count
+        self.high_water = max(self.high_water, self.in_use)
+        return sprites
+
+    def release(self, sprite):
+        """Take a sprite out of its groups and keep it for reuse."""
+        sprite.kill()
+        self.free.append(sprite)
+        self.in_use -= 1
+
+    def release_all(self, sprites):
+        """Release every sprite in a group or list."""
+        for sprite in list(sprites):
+            self.release(sprite)
+
+    def stats(self):
+        """Return the pool counters as a dictionary."""
+        return {
+            'capacity': self.created,
+            'in_use': self.in_use,
+            'high_water': self.high_water,
+            'reuse_ratio': self.reused / self.acquired if self.acquired else 0.0,
+        }
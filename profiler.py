@@ -0,0 +1,148 @@
+import json
+from collections import deque
+from time import perf_counter
+
+from text_cache import get_font
+
+# Where the frame time histogram splits its buckets, in milliseconds.
+HISTOGRAM_EDGES = (0.5, 1, 2, 4, 8, 16, 33)
+
+
+class FrameProfiler:
+    """
+    Time each phase of the main loop over a rolling window of frames.
+
+    The game only calls into the profiler while it is enabled, so a
+    disabled profiler costs one attribute check per frame.
+    """
+
+    def __init__(self, window=240, trace_limit=200_000):
+        """Initialize empty timing windows."""
+        self.enabled = False
+        self.window = window
+        self.samples = {}
+
+        # Chrome trace events, kept only while a trace is being recorded.
+        self.tracing = False
+        self.trace_events = deque(maxlen=trace_limit)
+        self.origin = perf_counter()
+
+    def start(self):
+        """Return a timestamp to pass to stop()."""
+        return perf_counter()
+
+    def stop(self, phase, start):
+        """Record the time since start for phase."""
+        end = perf_counter()
+        samples = self.samples.get(phase)
+        if samples is None:
+            samples = self.samples[phase] = deque(maxlen=self.window)
+        samples.append((end - start) * 1000)
+
+        if self.tracing:
+            self.trace_events.append(
+                (phase, (start - self.origin) * 1e6, (end - start) * 1e6))
+
+    def end_frame(self, frame_start):
+        """Record the whole frame's time."""
+        self.stop('frame', frame_start)
+
+    def summary(self, phase):
+        """Return p50, p95 and max milliseconds for phase over the window."""
+        ordered = sorted(self.samples.get(phase, ()))
+        if not ordered:
+            return 0.0, 0.0, 0.0
+        return (ordered[len(ordered) // 2],
+                ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                ordered[-1])
+
+    def histogram(self, phase, edges=HISTOGRAM_EDGES):
+        """Count the window's samples for phase into buckets split at edges (ms)."""
+        counts = [0] * (len(edges) + 1)
+        for ms in self.samples.get(phase, ()):
+            bucket = 0
+            while bucket < len(edges) and ms > edges[bucket]:
+                bucket += 1
+            counts[bucket] += 1
+        return counts
+
+    def start_trace(self):
+        """Start recording trace events."""
+        self.trace_events.clear()
+        self.tracing = True
+
+    def export_trace(self, path):
+        """Stop tracing and write the events as a Chrome trace-event JSON file."""
+        self.tracing = False
+        events = [{'name': phase, 'ph': 'X', 'ts': ts, 'dur': dur, 'pid': 1, 'tid': 1}
+                  for phase, ts, dur in self.trace_events]
+        with open(path, 'w') as file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, file)
+        return len(events)
+
+
+class ProfilerOverlay:
+    """A HUD showing FPS, phase timings and entity counts."""
+
+    def __init__(self, ai_game, profiler, phases, refresh_frames=15):
+        """Prepare the font and remember what to show."""
+        self.ai_game = ai_game
+        self.screen = ai_game.screen
+        self.profiler = profiler
+        self.phases = phases
+        self.font = get_font(None, 22)
+        self.text_color = (20, 20, 20)
+        self.bg_color = (255, 255, 200)
+
+        # Text is re-rendered every refresh_frames frames, not every frame.
+        self.refresh_frames = refresh_frames
+        self.frames_until_refresh = 0
+        self.images = []
+
+    def _prep_lines(self):
+        """Render the overlay's lines of text."""
+        ai = self.ai_game
+        lines = [f"FPS {ai.clock.get_fps():5.1f}   aliens {len(ai.aliens)}"
+                 f"   bullets {len(ai.bullets)}   explosions {len(ai.explosions)}"]
+        audio = ai.audio.stats()
+        lines.append(f"voices {sum(audio['active_voices'].values())}"
+                     f"   sounds played {audio['played']}   dropped {audio['dropped']}")
+        quality = ai.governor.stats()
+        lines.append(f"quality {quality['name']}   tier changes {len(quality['changes'])}")
+        if ai.core.wave_stats:
+            wave = ai.core.wave_stats[-1]
+            lines.append(f"wave {wave['wave']}   {wave['aliens']} aliens"
+                         f"   built in {wave['build_ms']:.2f} ms")
+        for phase in self.phases + ('frame',):
+            p50, p95, worst = self.profiler.summary(phase)
+            lines.append(f"{phase:<11} p50 {p50:6.2f}  p95 {p95:6.2f}  max {worst:6.2f} ms")
+        counts = self.profiler.histogram('frame')
+        labels = ([f"<{HISTOGRAM_EDGES[0]:g}"]
+                  + [f"{low:g}-{high:g}" for low, high in zip(HISTOGRAM_EDGES, HISTOGRAM_EDGES[1:])]
+                  + [f">{HISTOGRAM_EDGES[-1]:g}"])
+        lines.append("frames (ms) " + "  ".join(
+            f"{label}: {count}" for label, count in zip(labels, counts)))
+        p50, p95, worst = ai.input_handler.latency_stats()
+        lines.append(f"{'input lag':<11} p50 {p50:6.2f}  p95 {p95:6.2f}  max {worst:6.2f} ms")
+        hit = ai.last_hit_sequence
+        if hit is not None:
+            lines.append(f"last ship hit: {hit['frames']} frames, max {hit['max_frame_ms']:.2f} ms,"
+                         f" {hit['frames_over_budget']} over the {hit['budget_ms']:.2f} ms budget")
+        if self.profiler.tracing:
+            lines.append(f"tracing: {len(self.profiler.trace_events)} events")
+        self.images = [self.font.render(line, True, self.text_color, self.bg_color)
+                       for line in lines]
+
+    def draw(self):
+        """Draw the overlay in the bottom-left corner and return the rects drawn."""
+        if self.frames_until_refresh <= 0:
+            self._prep_lines()
+            self.frames_until_refresh = self.refresh_frames
+        self.frames_until_refresh -= 1
+
+        rects = []
+        y = self.screen.get_height() - 10 - sum(image.get_height() for image in self.images)
+        for image in self.images:
+            rects.append(self.screen.blit(image, (10, y)))
+            y += image.get_height()
+        return rects
@@ -0,0 +1,209 @@
+import pygame
+
+
+class FullRenderer:
+    """Clear the whole screen and flip it every frame."""
+
+    def __init__(self, display, bg_color):
+        """Remember the display and its background color."""
+        self.display = display
+        self.screen = display.surface
+        self.bg_color = bg_color
+
+    def clear(self):
+        """Fill the whole screen with the background color."""
+        self.screen.fill(self.bg_color)
+
+    def add(self, rects):
+        """Changed regions don't matter when the whole screen is flipped."""
+
+    def invalidate(self):
+        """Every frame is already a full redraw."""
+
+    def present(self):
+        """Show the finished frame."""
+        self.display.flip()
+
+
+class DirtyRenderer:
+    """
+    Clear and push only the parts of the screen that changed.
+
+    Everything drawn reports the rect it covered with add(). Next frame
+    those rects are cleared to the background, and both the old and new
+    rects are sent to the display, so the cost follows how much of
+    the screen changes rather than the screen size.
+    """
+
+    def __init__(self, display, bg_color):
+        """Start with a full redraw."""
+        self.display = display
+        self.screen = display.surface
+        self.bg_color = bg_color
+        self.last_rects = []
+        self.rects = []
+        self.full_redraw = True
+
+    def clear(self):
+        """Erase what was drawn last frame."""
+        if self.full_redraw:
+            self.screen.fill(self.bg_color)
+        else:
+            for rect in self.last_rects:
+                self.screen.fill(self.bg_color, rect)
+
+    def add(self, rects):
+        """Record a drawn rect, or a list of them."""
+        if isinstance(rects, pygame.Rect):
+            self.rects.append(rects)
+        else:
+            self.rects.extend(rects)
+
+    def invalidate(self):
+        """Redraw and push the whole screen next frame."""
+        self.full_redraw = True
+
+    def present(self):
+        """Push the changed regions to the display."""
+        if self.full_redraw:
+            self.display.flip()
+            self.full_redraw = False
+        else:
+            self.display.update(self.last_rects + self.rects)
+        self.last_rects = self.rects
+        self.rects = []
+
+
+class FleetRenderer:
+    """
+    Draw the alien fleet as one cached picture.
+
+    The aliens all move together, so the fleet's picture only has to be
+    drawn when a new fleet arrives; after that only its position
+    changes. Aliens shot down are erased from the picture, and any
+    living aliens overlapping them are redrawn into the hole, so a kill
+    costs the same whatever the fleet's size. When caching is off, the
+    aliens are batched into a single Surface.blits() call every frame.
+
+    Under load, refresh_every lets the picture lag up to that many
+    frames behind aliens being shot down. A new fleet is never lagged.
+    """
+
+    # Color left transparent in the cached picture.
+    KEY_COLOR = (255, 0, 255)
+
+    def __init__(self, core, screen, cache=True):
+        """Start without a cached picture."""
+        self.core = core
+        self.screen = screen
+        self.cache = cache
+        self.refresh_every = 1
+
+        self.version = None
+        self.fleet_number = None
+        self.stale_frames = 0
+        self.composite = None
+        self.composite_pos = (0, 0)
+        self.anchor = (0.0, 0)
+        # Where each alien in the picture was drawn, in the picture's coordinates.
+        self.drawn = {}
+
+        # Counters for stats().
+        self.composite_frames = 0
+        self.batched_frames = 0
+        self.rebuilds = 0
+        self.erased = 0
+
+    def draw(self, dx=0):
+        """Draw the fleet shifted dx pixels and return the rects drawn."""
+        core = self.core
+        if self.cache and core.fleet_number != self.fleet_number:
+            self._build()
+        elif self.composite is not None and core.fleet_version != self.version:
+            if self.stale_frames < self.refresh_every - 1:
+                # Keep showing the old picture for a few more frames.
+                self.stale_frames += 1
+            else:
+                self._erase_killed()
+
+        if self.composite is None:
+            self.batched_frames += 1
+            core.sync_fleet()
+            return self.screen.blits(
+                [(alien.image, alien.rect.move(dx, 0)) for alien in core.aliens.sprites()])
+
+        # Place the picture by how far the fleet has moved since it was drawn.
+        self.composite_frames += 1
+        x = self.composite_pos[0] + round(core.fleet_x - self.anchor[0]) + dx
+        y = self.composite_pos[1] + core.fleet_y - self.anchor[1]
+        return [self.screen.blit(self.composite, (x, y))]
+
+    def _build(self):
+        """Draw the living aliens of a new fleet into the cached picture."""
+        core = self.core
+        self.fleet_number = core.fleet_number
+        self.version = core.fleet_version
+        self.stale_frames = 0
+        self.composite = None
+        self.drawn = {}
+
+        core.sync_fleet()
+        aliens = core.aliens.sprites()
+        if not aliens:
+            return
+
+        bounds = aliens[0].rect.unionall([alien.rect for alien in aliens])
+        self.drawn = {alien: alien.rect.move(-bounds.x, -bounds.y) for alien in aliens}
+        composite = pygame.Surface(bounds.size).convert(self.screen)
+        composite.fill(self.KEY_COLOR)
+        composite.blits([(alien.image, rect) for alien, rect in self.drawn.items()],
+                        doreturn=False)
+        # Run-length encoding lets blits skip the gaps between aliens quickly.
+        composite.set_colorkey(self.KEY_COLOR, pygame.RLEACCEL)
+
+        self.composite = composite
+        self.composite_pos = bounds.topleft
+        self.anchor = (core.fleet_x, core.fleet_y)
+        self.rebuilds += 1
+
+    def _erase_killed(self):
+        """Cut the aliens that have left the fleet out of the cached picture."""
+        core = self.core
+        self.version = core.fleet_version
+        self.stale_frames = 0
+
+        living = core.aliens.spritedict
+        killed = [alien for alien in self.drawn if alien not in living]
+        holes = [self.drawn.pop(alien) for alien in killed]
+        if not holes:
+            return
+
+        # Take the key off while editing: pixels changed under run-length
+        # encoding can be lost when the picture is next encoded.
+        composite = self.composite
+        composite.set_colorkey(None)
+        for hole in holes:
+            composite.fill(self.KEY_COLOR, hole)
+
+        # Put back the parts of living aliens the holes cut into.
+        aliens = list(self.drawn)
+        rects = list(self.drawn.values())
+        for hole in holes:
+            overlapping = hole.collidelistall(rects)
+            if overlapping:
+                composite.set_clip(hole)
+                composite.blits([(aliens[index].image, rects[index]) for index in overlapping],
+                                doreturn=False)
+        composite.set_clip(None)
+        composite.set_colorkey(self.KEY_COLOR, pygame.RLEACCEL)
+        self.erased += len(holes)
+
+    def stats(self):
+        """Return the drawing counters as a dictionary."""
+        return {
+            'composite_frames': self.composite_frames,
+            'batched_frames': self.batched_frames,
+            'rebuilds': self.rebuilds,
+            'erased': self.erased,
+            'refresh_every': self.refresh_every,
+        }
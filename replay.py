@@ -0,0 +1,146 @@
+import os
+import struct
+import sys
+import zlib
+from time import perf_counter
+
+from settings import Settings
+from game_core import GameCore, TickInput
+
+# File layout: a fixed header, then the per-tick inputs and the score/level
+# trajectory, each zlib-compressed and prefixed with its length.
+MAGIC = b'AIRP'
+VERSION = 2
+HEADER = struct.Struct('<4sBQHHHB')
+DIFFICULTIES = ('easy', 'medium', 'hard')
+LENGTH = struct.Struct('<I')
+TRAJECTORY_POINT = struct.Struct('<IQI')
+
+# One byte of input per tick.
+MOVE_LEFT = 1
+MOVE_RIGHT = 2
+FIRE = 4
+
+
+def pack_input(inputs):
+    """Pack a TickInput into a byte."""
+    return ((MOVE_LEFT if inputs.move_left else 0)
+            | (MOVE_RIGHT if inputs.move_right else 0)
+            | (FIRE if inputs.fire else 0))
+
+
+def unpack_input(bits):
+    """Turn a packed byte back into a TickInput."""
+    return TickInput(bool(bits & MOVE_LEFT), bool(bits & MOVE_RIGHT), bool(bits & FIRE))
+
+
+class InputRecorder:
+    """Record the input of every tick of one game, and how the score went."""
+
+    def __init__(self, core, seed):
+        """Start recording a game that was started with seed."""
+        self.core = core
+        self.seed = seed
+        self.settings = core.settings
+        self.inputs = bytearray()
+        self.trajectory = []
+        self.last_point = None
+
+    def record(self, inputs):
+        """Record one tick's input, after the core has stepped with it."""
+        self.inputs.append(pack_input(inputs))
+
+        point = (self.core.stats.score, self.core.stats.level)
+        if point != self.last_point:
+            self.trajectory.append((len(self.inputs),) + point)
+            self.last_point = point
+
+    def save(self, path):
+        """Write the recording to path."""
+        header = HEADER.pack(
+            MAGIC, VERSION, self.seed, self.settings.tick_rate,
+            self.settings.screen_width, self.settings.screen_height,
+            DIFFICULTIES.index(self.settings.difficulty))
+        inputs = zlib.compress(bytes(self.inputs), 9)
+        trajectory = zlib.compress(
+            b''.join(TRAJECTORY_POINT.pack(*point) for point in self.trajectory), 9)
+
+        with open(path, 'wb') as file:
+            file.write(header)
+            for block in (inputs, trajectory):
+                file.write(LENGTH.pack(len(block)))
+                file.write(block)
+
+
+class Recording:
+    """A recorded game read back from a file."""
+
+    def __init__(self, path):
+        """Read and unpack the recording at path."""
+        with open(path, 'rb') as file:
+            data = file.read()
+
+        (magic, version, self.seed, self.tick_rate, self.screen_width,
+         self.screen_height, difficulty) = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} Alien Invasion replay.")
+        self.difficulty = DIFFICULTIES[difficulty]
+
+        blocks = []
+        offset = HEADER.size
+        for _ in range(2):
+            (length,) = LENGTH.unpack_from(data, offset)
+            offset += LENGTH.size
+            blocks.append(zlib.decompress(data[offset:offset + length]))
+            offset += length
+
+        self.inputs = blocks[0]
+        self.trajectory = list(TRAJECTORY_POINT.iter_unpack(blocks[1]))
+
+    def apply_settings(self, settings):
+        """Make settings match the ones the game was recorded with."""
+        settings.tick_rate = self.tick_rate
+        settings.screen_width = self.screen_width
+        settings.screen_height = self.screen_height
+        settings.difficulty = self.difficulty
+
+
+def replay(recording, core=None):
+    """
+    Play a recording back as fast as possible and return the score/level
+    trajectory it produces, as (tick, score, level) tuples.
+    """
+    if core is None:
+        settings = Settings()
+        recording.apply_settings(settings)
+        core = GameCore(settings)
+
+    core.start_game(recording.seed)
+    recorder = InputRecorder(core, recording.seed)
+    for bits in recording.inputs:
+        inputs = unpack_input(bits)
+        core.step(inputs)
+        recorder.record(inputs)
+    return recorder.trajectory
+
+
+if __name__ == '__main__':
+    # Replay a recording headless and check it matches what was recorded.
+    if len(sys.argv) != 2:
+        sys.exit("usage: python replay.py RECORDING")
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+    recording = Recording(sys.argv[1])
+    start = perf_counter()
+    trajectory = replay(recording)
+    elapsed = max(perf_counter() - start, 1e-9)
+
+    ticks = len(recording.inputs)
+    final_tick, score, level = trajectory[-1] if trajectory else (0, 0, 1)
+    print(f"Replayed {ticks} ticks in {elapsed:.3f}s ({ticks / elapsed:,.0f} ticks/s).")
+    print(f"Final score {score:,} at level {level}.")
+    if trajectory == recording.trajectory:
+        print("Score/level trajectory matches the recording.")
+    else:
+        sys.exit("Score/level trajectory differs from the recording.")
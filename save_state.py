@@ -0,0 +1,284 @@
+"""
+Save and restore the whole state of a game as a binary blob.
+
+A save state holds everything GameCore needs to carry on exactly where
+it was: stats, the settings that change during a game, the ship, every
+bullet and alien, and the random number generator. The shell can add
+its explosions, which capture() stores and restore() hands back.
+"""
+import struct
+import sys
+from array import array
+from collections import deque
+from time import perf_counter
+
+MAGIC = b'AISS'
+VERSION = 1
+HEADER = struct.Struct('<4sB')
+DIFFICULTIES = ('easy', 'medium', 'hard')
+
+# ticks, game_active, respawn_ticks, invulnerable_ticks, alien_step,
+# bullet_step, fleet_x, fleet_y, score, level, ships_left, high_score,
+# difficulty, fleet_direction, ship_speed, bullet_speed, alien_speed,
+# alien_points, ship x, ship prev_x, aliens, bullets, explosions.
+CORE = struct.Struct('<I?HHdddiQHHQBbdddQddHHH')
+
+# The Mersenne Twister's 625 words, and the cached gauss() value.
+RNG = struct.Struct('<625I?d')
+RNG_START = HEADER.size + CORE.size
+RNG_END = RNG_START + RNG.size
+
+
+def _doubles(values):
+    """Return a list of floats as little-endian doubles."""
+    data = array('d', values)
+    if sys.byteorder == 'big':
+        data.byteswap()
+    return data.tobytes()
+
+
+def _read_doubles(data, offset, count):
+    """Read count little-endian doubles from data at offset."""
+    values = array('d')
+    values.frombytes(data[offset:offset + 8 * count])
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def capture(core, explosions=()):
+    """
+    Return the core's state as bytes. explosions is a list of
+    (center x, center y, frame_time, elapsed ms) tuples from the shell.
+    """
+    settings = core.settings
+    stats = core.stats
+
+    fleet = core.fleet
+    if fleet is not None:
+        count = len(fleet.sprites)
+        aliens = (fleet.x[:count].astype('<f8').tobytes()
+                  + fleet.y[:count].astype('<f8').tobytes()
+                  + fleet.living().tobytes())
+    else:
+        sprites = core.aliens.sprites()
+        count = len(sprites)
+        aliens = (_doubles([alien.x for alien in sprites])
+                  + _doubles([alien.rect.y for alien in sprites])
+                  + b'\x01' * count)
+
+    bullets = []
+    for bullet in core.bullets.sprites():
+        bullets += (bullet.rect.x, bullet.y)
+
+    _, words, gauss = core.rng.getstate()
+
+    return b''.join((
+        HEADER.pack(MAGIC, VERSION),
+        CORE.pack(core.ticks, core.game_active, core.respawn_ticks, core.invulnerable_ticks,
+                  core.alien_step, core.bullet_step, core.fleet_x, core.fleet_y,
+                  stats.score, stats.level, stats.ships_left, stats.high_score,
+                  DIFFICULTIES.index(settings.difficulty), settings.fleet_direction,
+                  settings.ship_speed, settings.bullet_speed, settings.alien_speed,
+                  settings.alien_points, core.ship.x, core.ship.prev_x,
+                  count, len(bullets) // 2, len(explosions)),
+        RNG.pack(*words, gauss is not None, gauss or 0.0),
+        aliens,
+        _doubles(bullets),
+        _doubles([value for explosion in explosions for value in explosion]),
+    ))
+
+
+def restore(core, data):
+    """
+    Put the core back in the state saved in data, and return the saved
+    explosions as (center x, center y, frame_time, elapsed ms) tuples.
+    """
+    magic, version = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Not a version {VERSION} Alien Invasion save state.")
+
+    settings = core.settings
+    stats = core.stats
+    (core.ticks, core.game_active, core.respawn_ticks, core.invulnerable_ticks,
+     core.alien_step, core.bullet_step, core.fleet_x, core.fleet_y,
+     stats.score, stats.level, stats.ships_left, stats.high_score,
+     difficulty, settings.fleet_direction,
+     settings.ship_speed, settings.bullet_speed, settings.alien_speed,
+     settings.alien_points, ship_x, ship_prev_x,
+     count, bullet_count, explosion_count) = CORE.unpack_from(data, HEADER.size)
+    settings.difficulty = DIFFICULTIES[difficulty]
+    core._set_wave()
+    rng = RNG.unpack_from(data, RNG_START)
+    core.rng.setstate((3, rng[:625], rng[626] if rng[625] else None))
+    offset = RNG_END
+
+    xs = _read_doubles(data, offset, count)
+    ys = _read_doubles(data, offset + 8 * count, count)
+    alive = data[offset + 16 * count:offset + 17 * count]
+    offset += 17 * count
+    _restore_aliens(core, xs, ys, alive)
+
+    positions = _read_doubles(data, offset, 2 * bullet_count)
+    offset += 16 * bullet_count
+    core.bullet_pool.release_all(core.bullets)
+    for index in range(bullet_count):
+        bullet = core.bullet_pool.acquire()
+        bullet.rect.x = positions[2 * index]
+        bullet.y = positions[2 * index + 1]
+        bullet.rect.y = bullet.y
+        core.bullets.add(bullet)
+
+    core.ship.x = ship_x
+    core.ship.prev_x = ship_prev_x
+    core.ship.rect.x = ship_x
+    core.events = []
+
+    values = _read_doubles(data, offset, 4 * explosion_count)
+    return [tuple(values[index:index + 4]) for index in range(0, 4 * explosion_count, 4)]
+
+
+def _restore_aliens(core, xs, ys, alive):
+    """Rebuild the fleet from saved positions, keeping the fleet's slots."""
+    core._empty_fleet()
+    for x, y, living in zip(xs, ys, alive):
+        core._create_alien(x, int(y))
+        if not living:
+            # Dead aliens keep their slot in the NumPy fleet.
+            alien = core.fleet.sprites[-1]
+            core.fleet.kill(alien)
+            core.alien_pool.release(alien)
+
+    if core.fleet is not None:
+        count = len(xs)
+        core.fleet.x[:count] = xs
+        core.fleet.y[:count] = ys
+        core.fleet.sync_sprites()
+    else:
+        for alien, x in zip(core.aliens.sprites(), xs):
+            alien.x = x
+    core._bucket_fleet()
+    core.fleet_version += 1
+
+
+class RewindBuffer:
+    """
+    The most recent save states, kept within a memory budget.
+
+    record() captures a state every tick; once the states take more than
+    budget bytes the oldest are dropped, so the budget sets how far back
+    a player can rewind. The random number generator only changes when a
+    fleet is made, so states share its part of the blob until it does.
+    """
+
+    def __init__(self, budget):
+        """Start empty, with a budget in bytes."""
+        self.budget = budget
+        self.states = deque()
+        self.size = 0
+
+        # Counters for stats().
+        self.captures = 0
+        self.capture_time = 0.0
+        self.captured_bytes = 0
+
+    def record(self, core, explosions=()):
+        """Capture the core's state and add it to the buffer."""
+        start = perf_counter()
+        state = capture(core, explosions)
+        self.capture_time += perf_counter() - start
+        self.captures += 1
+        self.captured_bytes += len(state)
+        self.push(state)
+
+    def push(self, state):
+        """Add a state, dropping the oldest ones if over budget."""
+        rng = state[RNG_START:RNG_END]
+        if self.states and self.states[-1][1] == rng:
+            rng = self.states[-1][1]
+            size = len(state) - len(rng)
+        else:
+            size = len(state)
+        self.states.append((state[:RNG_START] + state[RNG_END:], rng, size))
+        self.size += size
+
+        while self.size > self.budget and len(self.states) > 1:
+            self.size -= self.states.popleft()[2]
+            # The new oldest state now holds its own copy of the shared part.
+            rest, rng, size = self.states[0]
+            if size <= len(rest):
+                self.states[0] = (rest, rng, size + len(rng))
+                self.size += len(rng)
+
+    def pop(self):
+        """Remove and return the newest state, or None if there are none."""
+        if not self.states:
+            return None
+        rest, rng, size = self.states.pop()
+        self.size -= size
+        return rest[:RNG_START] + rng + rest[RNG_START:]
+
+    def clear(self):
+        """Forget every state."""
+        self.states.clear()
+        self.size = 0
+
+    def stats(self):
+        """Return the buffer's size and capture costs as a dictionary."""
+        captures = self.captures or 1
+        return {
+            'states': len(self.states),
+            'bytes': self.size,
+            'budget': self.budget,
+            'state_bytes': self.captured_bytes / captures,
+            'capture_ms': self.capture_time / captures * 1000,
+        }
+
+
+if __name__ == '__main__':
+    # Check that a restored game plays out exactly like the original.
+    import os
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    from settings import Settings
+    from game_core import GameCore, TickInput
+
+    def inputs(tick):
+        right = (tick // 90) % 2 == 0
+        return TickInput(move_left=not right, move_right=right, fire=tick % 6 == 0)
+
+    def trace(core, ticks, first):
+        points = []
+        for tick in range(first, first + ticks):
+            core.step(inputs(tick))
+            points.append((core.stats.score, core.stats.level, core.stats.ships_left,
+                           core.ship.rect.x, len(core.bullets), len(core.aliens)))
+        return points
+
+    for engine in ('numpy', 'sprites'):
+        settings = Settings()
+        settings.fleet_engine = engine
+        core = GameCore(settings)
+        core.start_game(3)
+        buffer = RewindBuffer(1 << 20)
+        for tick in range(900):
+            core.step(inputs(tick))
+            buffer.record(core)
+
+        saved = buffer.pop()
+        expected = trace(core, 1800, 900)
+
+        other_settings = Settings()
+        other_settings.fleet_engine = engine
+        other = GameCore(other_settings)
+        other.start_game(99)
+        restore(other, saved)
+        actual = trace(other, 1800, 900)
+
+        stats = buffer.stats()
+        print(f"{engine}: {stats['state_bytes']:.0f} bytes/state,"
+              f" {stats['capture_ms']:.3f} ms/capture, {stats['states']} states"
+              f" ({stats['states'] / settings.tick_rate:.1f}s) in {stats['budget']:,} bytes.")
+        if actual != expected:
+            sys.exit(f"{engine}: the restored game went differently.")
+    print("Restored games play out exactly like the originals.")
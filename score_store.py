@@ -0,0 +1,144 @@
+import queue
+import sqlite3
+import threading
+import time
+
+from assets import asset_path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    score INTEGER NOT NULL,
+    level INTEGER NOT NULL,
+    difficulty TEXT NOT NULL,
+    duration REAL NOT NULL,
+    played_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_leaderboard ON games (difficulty, score DESC);
+"""
+
+INSERT = ("INSERT INTO games (score, level, difficulty, duration, played_at)"
+          " VALUES (?, ?, ?, ?, ?)")
+
+DIFFICULTIES = ('easy', 'medium', 'hard')
+
+
+def _connect(path):
+    """Open path in write-ahead-log mode, creating the table if needed."""
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    # With a write-ahead log, NORMAL never corrupts the file on a crash;
+    # at worst the last few games are lost.
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+class ScoreStore:
+    """
+    Every finished game, kept in a SQLite file.
+
+    record_game() only puts the game on a queue; a writer thread with
+    its own connection saves whatever is queued in one transaction, so
+    the game loop never waits for the disk. Leaderboard queries use an
+    index on (difficulty, score), so they stay fast however many games
+    are stored.
+    """
+
+    def __init__(self, path):
+        """Open the store and start the writer thread."""
+        # A relative path is inside the game folder, whatever the working
+        # directory; ':memory:' is SQLite's database that is never saved.
+        if path != ':memory:':
+            path = asset_path(path)
+        self.path = path
+        self.connection = _connect(path)
+
+        self.queue = queue.Queue()
+        self.written = 0
+        self.write_error = None
+        self.thread = threading.Thread(target=self._write_games, daemon=True)
+        self.thread.start()
+
+    def record_game(self, score, level, difficulty, duration):
+        """Queue a finished game to be saved."""
+        self.queue.put((score, level, difficulty, duration, time.time()))
+
+    def _write_games(self):
+        """Save queued games until close() queues None; runs on the writer thread."""
+        connection = _connect(self.path)
+        running = True
+        while running:
+            rows = [self.queue.get()]
+            # Save everything that queued up while we waited, together.
+            while True:
+                try:
+                    rows.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in rows:
+                running = False
+                rows = [row for row in rows if row is not None]
+            if not rows:
+                continue
+
+            try:
+                # The transaction commits all of the rows, or none of them.
+                with connection:
+                    connection.executemany(INSERT, rows)
+                self.written += len(rows)
+            except sqlite3.Error as error:
+                self.write_error = error
+        connection.close()
+
+    def leaderboard(self, difficulty, limit=10):
+        """Return the best (score, level, duration, played_at) games for a difficulty."""
+        return self.connection.execute(
+            "SELECT score, level, duration, played_at FROM games"
+            " WHERE difficulty = ? ORDER BY score DESC LIMIT ?",
+            (difficulty, limit)).fetchall()
+
+    def high_score(self):
+        """Return the best score at any difficulty."""
+        best = 0
+        for difficulty in DIFFICULTIES:
+            (score,) = self.connection.execute(
+                "SELECT MAX(score) FROM games WHERE difficulty = ?", (difficulty,)).fetchone()
+            if score is not None:
+                best = max(best, score)
+        return best
+
+    def close(self):
+        """Save every queued game, then close the store."""
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+        self.connection.close()
+
+
+if __name__ == '__main__':
+    # Fill a throwaway store and time the queries the game makes at startup.
+    import os
+    import tempfile
+    from random import Random
+
+    rng = Random(1)
+    with tempfile.TemporaryDirectory() as folder:
+        store = ScoreStore(os.path.join(folder, 'scores.db'))
+        start = time.perf_counter()
+        for _ in range(300_000):
+            store.record_game(rng.randrange(0, 100_000, 10), rng.randint(1, 30),
+                              rng.choice(DIFFICULTIES), rng.uniform(10, 600))
+        queued = time.perf_counter() - start
+        store.close()
+        print(f"Queued 300,000 games in {queued * 1000:.0f} ms.")
+
+        start = time.perf_counter()
+        store = ScoreStore(os.path.join(folder, 'scores.db'))
+        top = store.leaderboard('medium', 10)
+        best = store.high_score()
+        elapsed = time.perf_counter() - start
+        store.close()
+        print(f"Reopened and read the leaderboard in {elapsed * 1000:.2f} ms;"
+              f" best medium score {top[0][0]:,}, high score {best:,}.")
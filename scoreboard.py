@@ -1,7 +1,4 @@
-import pygame
-from pygame.sprite import Sprite
-
-from ship import Ship
+from text_cache import get_font, GlyphAtlas, NumberText
 
 class Scoreboard:
     """A class to report scoring information."""
@@ -16,8 +13,14 @@ class Scoreboard:
 
         # Font settings for scoring information.
         self.text_color = (250, 0, 0)
-        self.font = pygame.font.SysFont(None, 48)
-        
+        self.font = get_font(None, 48)
+
+        # Numbers are built from pre-rendered digits, and only when they change.
+        atlas = GlyphAtlas(self.font, self.text_color, self.settings.bg_color)
+        self.score_text = NumberText(atlas, "Score: ")
+        self.high_score_text = NumberText(atlas, "High Score: ")
+        self.level_text = NumberText(atlas, "Level: ")
+
         # Prepare the initial score image.
         self.prep_score()
         self.prep_high_score()
@@ -27,46 +30,67 @@ class Scoreboard:
         """Turn the score into a rendered image."""
         rounded_score = round(self.stats.score, -1)
         score_str = "{:,}".format(rounded_score)
-        self.score_image = self.font.render(f"Score: {score_str}", True, self.text_color,
-                                           self.settings.bg_color)
-        
+        if not self.score_text.set_text(score_str):
+            return
+        self.score_image = self.score_text.image
+
         # Display the score at the top right of the screen.
         self.score_rect = self.score_image.get_rect()
         self.score_rect.right = self.screen_rect.right - 20
         self.score_rect.top = 20
     
     def show_score(self):
-        """Draw scores, level, and ships to the screen."""
-        self.screen.blit(self.score_image, self.score_rect)
-        self.screen.blit(self.high_score_image, self.high_score_rect)
-        self.screen.blit(self.level_image, self.level_rect)
+        """Draw scores, level, and ships to the screen and return the rects drawn."""
+        return [
+            self.screen.blit(self.score_image, self.score_rect),
+            self.screen.blit(self.high_score_image, self.high_score_rect),
+            self.screen.blit(self.level_image, self.level_rect),
+        ]
 
     def prep_high_score(self):
         """Turn the high score into a rendered image."""
         high_score = round(self.stats.high_score, -1)
         high_score_str = f"{high_score:,}"
-        self.high_score_image = self.font.render(f"High Score: {high_score_str}", True,
-                self.text_color, self.settings.bg_color)
-        
+        if not self.high_score_text.set_text(high_score_str):
+            return
+        self.high_score_image = self.high_score_text.image
+
         # Center the high score at the top of the screen.
         self.high_score_rect = self.high_score_image.get_rect()
         self.high_score_rect.centerx = self.screen_rect.centerx
         self.high_score_rect.top = self.score_rect.top
     
-    def check_high_score(self):
-        """Check to see if there's a new high score."""
-        if self.stats.score > self.stats.high_score:
-            self.stats.high_score = self.stats.score
-            self.prep_high_score()
-
     def prep_level(self):
         """Turn the level into a rendered image."""
         level_str = str(self.stats.level)
-        self.level_image = self.font.render(f"Level: {level_str}", True, self.text_color,
-                self.settings.bg_color)
-        
+        if not self.level_text.set_text(level_str):
+            return
+        self.level_image = self.level_text.image
+
         # Position the level below the score.
         self.level_rect = self.level_image.get_rect()
         self.level_rect.right = self.score_rect.right
         self.level_rect.top = self.score_rect.bottom + 10
     
+
+    def prep_leaderboard(self, difficulty, games):
+        """Render the best (score, level, ...) games of a difficulty, for the menu."""
+        font = get_font(None, 32)
+        lines = [f"Top scores ({difficulty})"]
+        lines += [f"{rank}.  {score:,}   level {level}"
+                  for rank, (score, level, *_) in enumerate(games, 1)]
+        self.leaderboard_images = [
+            font.render(line, True, self.text_color, self.settings.bg_color) for line in lines]
+
+        # Stack the lines under the difficulty buttons.
+        self.leaderboard_rects = []
+        top = self.screen_rect.centery + 215
+        for image in self.leaderboard_images:
+            rect = image.get_rect(centerx=self.screen_rect.centerx, top=top)
+            self.leaderboard_rects.append(rect)
+            top = rect.bottom + 4
+
+    def show_leaderboard(self):
+        """Draw the leaderboard and return the rects drawn."""
+        return [self.screen.blit(image, rect)
+                for image, rect in zip(self.leaderboard_images, self.leaderboard_rects)]
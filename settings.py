@@ -7,24 +7,106 @@ class Settings:
         self.screen_width = 1200
         self.screen_height = 800
         self.bg_color = (211, 211, 211)  # Light gray color
+        # 'full' redraws and flips the whole screen every frame; 'dirty'
+        # only clears and pushes the regions that changed.
+        self.render_mode = 'full'
+        # 'composite' draws the fleet from one cached picture while no
+        # aliens join or leave it; 'blits' draws every alien each frame.
+        self.fleet_render_mode = 'composite'
+        # The game always draws at screen_width x screen_height. 'scaled'
+        # stretches that to the window on the GPU, keeping its shape;
+        # 'integer' only scales by whole multiples, inside a border of
+        # border_color; 'window' shows it unscaled. F11 toggles fullscreen.
+        self.display_mode = 'scaled'
+        self.fullscreen = False
+        # 'nearest' keeps pixels sharp when scaling; 'linear' smooths them.
+        self.scale_filter = 'nearest'
+        self.border_color = (0, 0, 0)
 
-        # Ship settings
-        self.ship_speed = 3
+        # Timing settings. The game rules run tick_rate times a second no
+        # matter how fast frames are drawn; frame_rate caps drawing (0 for
+        # no cap). After a long stall at most max_catchup_steps ticks run
+        # in one frame, so a slow machine can't fall further and further behind.
+        self.tick_rate = 60
+        self.frame_rate = 60
+        self.max_catchup_steps = 5
+
+        # Ship settings. All speeds are in pixels per second.
+        self.ship_speed = 180.0
         self.ship_limit = 3
+        # After a hit the game pauses for ship_respawn_time seconds while the
+        # ship explodes, then the new ship can't be hit for ship_invulnerable_time.
+        self.ship_respawn_time = 1.0
+        self.ship_invulnerable_time = 1.0
 
         # Bullet settings
-        self.bullet_speed = 5.0
+        self.bullet_speed = 300.0
         self.bullets_allowed = 5
+        # Shots per second while a fire key is held.
+        self.fire_rate = 8
 
         # Alien settings
-        self.alien_speed = 1.0
+        self.alien_speed = 60.0
         self.fleet_drop_speed = 10
         # fleet_direction of 1 represents right; -1 represents left.
         self.fleet_direction = 1
+        # 'numpy' moves the fleet as arrays (when NumPy is installed);
+        # 'sprites' moves every Alien sprite on its own.
+        self.fleet_engine = 'numpy'
+        # Bullet-alien collisions for either engine: 'grid' buckets the
+        # fleet into cells of collision_cell_size, 'groupcollide' tests
+        # every bullet against every alien.
+        self.collision_mode = 'grid'
+        self.collision_cell_size = 64
+        # Aliens built up front and reused for every fleet.
+        self.alien_pool_size = 64
+        # Explosions built up front and reused.
+        self.explosion_pool_size = 16
+
+        # Wave settings. Each level's fleet comes from the waves in
+        # wave_file; wave_override names one wave to use for every level.
+        self.wave_file = 'waves.json'
+        self.wave_override = None
+        # Alien speed and points of the current wave, as multiples of the level's.
+        self.wave_speed = 1.0
+        self.wave_points = 1.0
 
         # Difficulty settings
         self.difficulty = 'medium'
 
+        # Replay settings. seed fixes the random fleets of every game (None
+        # picks a new seed each game); record_dir, if set, saves a replay
+        # of every game there.
+        self.seed = None
+        self.record_dir = None
+
+        # Score settings. Every finished game is saved to the SQLite file
+        # score_path; the menu shows the best leaderboard_size games.
+        # Like the other files the game writes, a relative score_path is
+        # inside the game folder.
+        self.score_path = 'scores.db'
+        self.leaderboard_size = 5
+
+        # Save state settings. Holding R rewinds through the last states,
+        # which may use up to rewind_budget bytes (0 turns rewinding off);
+        # F5 saves the game to save_state_path and F9 loads it.
+        self.rewind_budget = 2 * 1024 * 1024
+        self.save_state_path = 'savestate.aistate'
+
+        # Spectator settings. With a port, every tick is streamed to
+        # spectators connecting to it (see spectator.py).
+        self.spectator_port = None
+
+        # Profiler settings. F3 shows the frame profiler overlay; F4 starts
+        # a trace, and F4 again writes it to trace_path.
+        self.trace_path = 'frame_trace.json'
+        # Lower the quality of explosions, the HUD and the fleet's
+        # picture while frames run over budget (see governor.py).
+        self.adaptive_quality = True
+
+        # Print the time to the first frame and to the playable menu.
+        self.startup_report = False
+
         # Speedup scale
         self.speedup_scale = 1.1
         # score_scale
@@ -32,22 +114,25 @@ class Settings:
 
     def initialize_dynamic_settings(self):
         """Initialize settings that change throughout the game."""
+        # Every game starts with the fleet heading right.
+        self.fleet_direction = 1
+
         # Score settings
         self.alien_points = 50
         if self.difficulty == 'easy':
-            self.ship_speed = 1.5
-            self.bullet_speed = 3.0
-            self.alien_speed = 1.0
+            self.ship_speed = 90.0
+            self.bullet_speed = 180.0
+            self.alien_speed = 60.0
             self.alien_points = 50
         elif self.difficulty == 'medium':
-            self.ship_speed = 3.0
-            self.bullet_speed = 5.0
-            self.alien_speed = 1.5
+            self.ship_speed = 180.0
+            self.bullet_speed = 300.0
+            self.alien_speed = 90.0
             self.alien_points = 100
         elif self.difficulty == 'hard':
-            self.ship_speed = 4.5
-            self.bullet_speed = 7.0
-            self.alien_speed = 10.0
+            self.ship_speed = 270.0
+            self.bullet_speed = 420.0
+            self.alien_speed = 600.0
             self.alien_points = 150
 
 
@@ -1,4 +1,3 @@
-import pygame
 from pygame.sprite import Sprite
 
 class Ship(Sprite):
@@ -11,36 +10,45 @@ class Ship(Sprite):
         self.screen_rect = ai_game.screen.get_rect()
         self.settings = ai_game.settings
 
-        #load the ship image and get its rect.
-        self.image = pygame.image.load("images\ship.bmp")
+        # Use the shared ship image and get its rect.
+        self.image = ai_game.assets.image('ship')
         self.rect = self.image.get_rect()
 
         # Start each new ship at the bottom center of the screen.
         self.rect.midbottom = self.screen_rect.midbottom
 
-        # Store a float for the ship's exact horizontal position.
+        # Store a float for the ship's exact horizontal position, and where
+        # it was before the last tick for drawing between ticks.
         self.x = float(self.rect.x)
+        self.prev_x = self.x
 
         # Movement flags; start with a ship that's not moving.
         self.moving_right = False
         self.moving_left = False
 
-    def update(self):
-        """Update the ship'S position based on the movement flag."""
+    def update(self, dt):
+        """Move the ship for dt seconds based on the movement flag."""
+        self.prev_x = self.x
+
         # Update the ship's x value, not the rect.
         if self.moving_right and self.rect.right < self.screen_rect.right:
-            self.x += self.settings.ship_speed
+            self.x += self.settings.ship_speed * dt
         if self.moving_left and self.rect.left > 0:
-            self.x -= self.settings.ship_speed
+            self.x -= self.settings.ship_speed * dt
 
         # Update rect object from self.x
         self.rect.x = self.x
 
-    def blitme(self):
-        """Draw the ship at its current location."""
-        self.screen.blit(self.image, self.rect)
+    def blitme(self, alpha=1.0):
+        """
+        Draw the ship and return the rect drawn. alpha is how far between
+        the last two ticks to draw it, from 0 to 1.
+        """
+        dx = round((self.x - self.prev_x) * (alpha - 1))
+        return self.screen.blit(self.image, self.rect.move(dx, 0))
 
     def center_ship(self):
         """Center the ship on screen."""
         self.rect.midbottom = self.screen_rect.midbottom
-        self.x = float(self.rect.x)
\ No newline at end of file
+        self.x = float(self.rect.x)
+        self.prev_x = self.x
\ No newline at end of file
@@ -0,0 +1,123 @@
+from random import Random
+
+import pygame
+
+
+class SpatialHash:
+    """
+    A uniform grid that buckets sprites by the cells their rects cover.
+
+    Sprites that all move together, like the alien fleet, don't need to be
+    re-bucketed every tick: call move() with the shared motion and the grid
+    shifts its queries instead.
+    """
+
+    def __init__(self, cell_size=64):
+        """Initialize an empty grid."""
+        self.cell_size = cell_size
+        self.cells = {}
+        self.offset_x = 0.0
+        self.offset_y = 0.0
+
+    def rebuild(self, sprites):
+        """Clear the grid and insert every sprite, keeping their order."""
+        self.cells = {}
+        self.offset_x = 0.0
+        self.offset_y = 0.0
+        for order, sprite in enumerate(sprites):
+            for cell in self._cells_for(sprite.rect):
+                bucket = self.cells.get(cell)
+                if bucket is None:
+                    self.cells[cell] = [(order, sprite)]
+                else:
+                    bucket.append((order, sprite))
+
+    def move(self, dx, dy):
+        """Record that every sprite in the grid moved by (dx, dy)."""
+        self.offset_x += dx
+        self.offset_y += dy
+
+    def query(self, rect):
+        """Return the living sprites that overlap rect, in insertion order."""
+        # Look up where rect was relative to the sprites when they were
+        # bucketed, padded a pixel each way for rounding of their rects.
+        local_rect = rect.move(-round(self.offset_x), -round(self.offset_y))
+        found = {}
+        for cell in self._cells_for(local_rect.inflate(2, 2)):
+            for order, sprite in self.cells.get(cell, ()):
+                if sprite.alive() and rect.colliderect(sprite.rect):
+                    found[order] = sprite
+        return [found[order] for order in sorted(found)]
+
+    def groupcollide(self, group_a, group_b):
+        """
+        Collide two groups like pygame.sprite.groupcollide(a, b, True, True),
+        testing each sprite in group_a only against nearby sprites in group_b.
+
+        group_b must be the sprites last passed to rebuild().
+        """
+        collisions = {}
+        for sprite in group_a.sprites():
+            hits = self.query(sprite.rect)
+            if hits:
+                for hit in hits:
+                    hit.kill()
+                sprite.kill()
+                collisions[sprite] = hits
+        return collisions
+
+    def _cells_for(self, rect):
+        """Yield the grid cells a rect covers."""
+        size = self.cell_size
+        for cell_x in range(rect.left // size, (rect.right - 1) // size + 1):
+            for cell_y in range(rect.top // size, (rect.bottom - 1) // size + 1):
+                yield cell_x, cell_y
+
+
+def _random_groups(rng, size):
+    """Build random bullet and alien groups for the self-check."""
+    bullets = pygame.sprite.Group()
+    aliens = pygame.sprite.Group()
+    for group, count, width, height in ((bullets, 20, 13, 29), (aliens, 200, 52, 52)):
+        for _ in range(count):
+            sprite = pygame.sprite.Sprite()
+            sprite.rect = pygame.Rect(rng.randrange(size[0]), rng.randrange(size[1]),
+                                      width, height)
+            group.add(sprite)
+    return bullets, aliens
+
+
+def compare_with_groupcollide(trials=200, seed=0, size=(1200, 800)):
+    """Check that the grid finds the same collisions as groupcollide."""
+    rng = Random(seed)
+    grid = SpatialHash()
+    for trial in range(trials):
+        state = rng.getstate()
+        expected = pygame.sprite.groupcollide(*_random_groups(rng, size), True, True)
+        rng.setstate(state)
+        bullets, aliens = _random_groups(rng, size)
+
+        # Bucket the aliens somewhere else and move them into place, the
+        # way the fleet moves after it is built.
+        dx, dy = rng.uniform(-300, 300), rng.randrange(0, 100, 10)
+        for alien in aliens:
+            alien.rect.move_ip(-round(dx), -dy)
+        grid.rebuild(aliens.sprites())
+        for alien in aliens:
+            alien.rect.move_ip(round(dx), dy)
+        grid.move(dx, dy)
+
+        actual = grid.groupcollide(bullets, aliens)
+
+        expected_rects = sorted((tuple(b.rect), [tuple(a.rect) for a in hits])
+                                for b, hits in expected.items())
+        actual_rects = sorted((tuple(b.rect), [tuple(a.rect) for a in hits])
+                              for b, hits in actual.items())
+        if expected_rects != actual_rects:
+            raise AssertionError(f"Collision sets differ in trial {trial}.")
+    return trials
+
+
+if __name__ == '__main__':
+    # Compare the grid with groupcollide on randomized fleets.
+    print(f"{compare_with_groupcollide()} randomized fleets matched groupcollide.")
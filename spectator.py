@@ -0,0 +1,377 @@
+"""
+Stream a live game to spectators over TCP.
+
+Every tick the game's state is packed into a small binary snapshot. A
+spectator gets a full snapshot (a keyframe) when it joins and then every
+keyframe_interval ticks; in between it gets the snapshot XORed with the
+one before it and zlib-compressed, which is mostly zeros and packs down
+to a few bytes.
+
+    python alien_invasion.py --spectate 7777     # serve the game
+    python spectator.py localhost 7777           # watch it
+    python spectator.py --self-test              # check a localhost round trip
+"""
+import os
+import socket
+import struct
+import sys
+import zlib
+from array import array
+from time import perf_counter
+
+# Only used with the NumPy fleet, which needs NumPy anyway.
+from fleet import np
+
+# Game state: tick, score, level, ships left, flags, ship x, alien slots,
+# bullets. Then a bitmask of living aliens, the x and y of every alien
+# slot and the x and y of every bullet, all as 16-bit integers.
+STATE = struct.Struct('<IQHBBhHH')
+ACTIVE = 1
+RESPAWNING = 2
+SHIP_VISIBLE = 4
+
+# Every message is a kind byte and a payload length, then the payload.
+MESSAGE = struct.Struct('<BI')
+HELLO = 0
+KEYFRAME = 1
+DELTA = 2
+HELLO_BODY = struct.Struct('<HHH')
+
+# A spectator that falls this far behind is dropped rather than slowing the game.
+MAX_BACKLOG = 1 << 20
+
+
+def _int16s(values):
+    """Return a little-endian array of 16-bit integers as bytes."""
+    data = array('h', values)
+    if sys.byteorder == 'big':
+        data.byteswap()
+    return data.tobytes()
+
+
+def _read_int16s(data, offset, count):
+    """Read count little-endian 16-bit integers from data at offset."""
+    values = array('h')
+    values.frombytes(data[offset:offset + 2 * count])
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def encode_state(core, ship_visible=True):
+    """Pack the game's state into snapshot bytes."""
+    fleet = core.fleet
+    if fleet is not None:
+        # Fleet slots keep their place while aliens die, so deltas stay small.
+        count = len(fleet.sprites)
+        alive = fleet.living()
+        xs = fleet.lefts().astype('<i2').tobytes()
+        ys = fleet.y[:count].astype('<i2').tobytes()
+        mask = np.packbits(alive, bitorder='little').tobytes()
+    else:
+        aliens = core.aliens.sprites()
+        count = len(aliens)
+        xs = _int16s([alien.rect.x for alien in aliens])
+        ys = _int16s([alien.rect.y for alien in aliens])
+        mask = b'\xff' * (count // 8) + (bytes([(1 << (count % 8)) - 1]) if count % 8 else b'')
+
+    bullets = core.bullets.sprites()
+    positions = []
+    for bullet in bullets:
+        positions += bullet.rect.topleft
+
+    flags = ((ACTIVE if core.game_active else 0)
+             | (RESPAWNING if core.ship_respawning else 0)
+             | (SHIP_VISIBLE if ship_visible else 0))
+    stats = core.stats
+    return b''.join((
+        STATE.pack(core.ticks, stats.score, stats.level, stats.ships_left, flags,
+                   core.ship.rect.x, count, len(bullets)),
+        mask, xs, ys, _int16s(positions)))
+
+
+class Snapshot:
+    """Game state unpacked from snapshot bytes."""
+
+    def __init__(self, data):
+        """Unpack data made by encode_state()."""
+        (self.tick, self.score, self.level, self.ships_left, flags, self.ship_x,
+         count, bullet_count) = STATE.unpack_from(data)
+        self.game_active = bool(flags & ACTIVE)
+        self.respawning = bool(flags & RESPAWNING)
+        self.ship_visible = bool(flags & SHIP_VISIBLE)
+
+        offset = STATE.size
+        mask = data[offset:offset + (count + 7) // 8]
+        offset += len(mask)
+        xs = _read_int16s(data, offset, count)
+        ys = _read_int16s(data, offset + 2 * count, count)
+        offset += 4 * count
+        self.aliens = [(xs[index], ys[index]) for index in range(count)
+                       if mask[index >> 3] & (1 << (index & 7))]
+
+        positions = _read_int16s(data, offset, 2 * bullet_count)
+        self.bullets = list(zip(positions[0::2], positions[1::2]))
+
+
+def xor_bytes(data, previous):
+    """XOR data with previous, treating the shorter one as padded with zeros."""
+    if len(previous) < len(data):
+        previous = previous + bytes(len(data) - len(previous))
+    return (int.from_bytes(data, 'little')
+            ^ int.from_bytes(previous[:len(data)], 'little')).to_bytes(len(data), 'little')
+
+
+class SpectatorServer:
+    """Send the game to every spectator connected to a TCP port."""
+
+    def __init__(self, settings, port, host='127.0.0.1', keyframe_interval=60):
+        """Start listening for spectators."""
+        self.hello = MESSAGE.pack(HELLO, HELLO_BODY.size) + HELLO_BODY.pack(
+            settings.screen_width, settings.screen_height, settings.tick_rate)
+        self.keyframe_interval = keyframe_interval
+
+        self.listener = socket.create_server((host, port))
+        self.listener.setblocking(False)
+        self.port = self.listener.getsockname()[1]
+        self.clients = {}
+
+        self.previous = None
+        self.ticks_since_keyframe = 0
+
+        # Counters for stats().
+        self.ticks = 0
+        self.bytes_sent = 0
+        self.encode_time = 0.0
+
+    def _accept(self):
+        """Take any new spectators, and greet them with the next keyframe."""
+        while True:
+            try:
+                client, _ = self.listener.accept()
+            except BlockingIOError:
+                return
+            client.setblocking(False)
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.clients[client] = bytearray(self.hello)
+            self.previous = None
+
+    def broadcast(self, core, ship_visible=True):
+        """Send this tick's state to every spectator."""
+        self._accept()
+        if not self.clients:
+            return
+
+        start = perf_counter()
+        state = encode_state(core, ship_visible)
+        if self.previous is None or self.ticks_since_keyframe >= self.keyframe_interval:
+            message = self._message(KEYFRAME, state)
+            self.ticks_since_keyframe = 0
+        else:
+            message = self._message(DELTA, xor_bytes(state, self.previous))
+            self.ticks_since_keyframe += 1
+        self.previous = state
+        self.encode_time += perf_counter() - start
+
+        self.ticks += 1
+        self.bytes_sent += len(message)
+        for client, backlog in list(self.clients.items()):
+            backlog += message
+            self._flush(client, backlog)
+
+    def _message(self, kind, payload):
+        """Compress payload into a message."""
+        body = zlib.compress(payload, 1)
+        return MESSAGE.pack(kind, len(body)) + body
+
+    def _flush(self, client, backlog):
+        """Send as much of a spectator's backlog as the socket takes."""
+        try:
+            sent = client.send(backlog)
+            del backlog[:sent]
+        except BlockingIOError:
+            pass
+        except OSError:
+            self._drop(client)
+            return
+        if len(backlog) > MAX_BACKLOG:
+            self._drop(client)
+
+    def _drop(self, client):
+        """Disconnect a spectator."""
+        client.close()
+        del self.clients[client]
+
+    def stats(self):
+        """Return bandwidth and encoding time per tick as a dictionary."""
+        ticks = self.ticks or 1
+        return {
+            'spectators': len(self.clients),
+            'bytes_per_tick': self.bytes_sent / ticks,
+            'encode_ms': self.encode_time / ticks * 1000,
+        }
+
+    def close(self):
+        """Disconnect everyone and stop listening."""
+        for client in list(self.clients):
+            self._drop(client)
+        self.listener.close()
+
+
+class SpectatorClient:
+    """Receive a game from a SpectatorServer and rebuild its snapshots."""
+
+    def __init__(self, host, port):
+        """Connect to the server."""
+        self.socket = socket.create_connection((host, port))
+        self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.buffer = bytearray()
+        self.previous = None
+        self.screen_size = None
+        self.tick_rate = None
+
+        # Counters for stats().
+        self.snapshots = 0
+        self.bytes_received = 0
+        self.decode_time = 0.0
+
+    def receive(self, timeout=None):
+        """
+        Read what has arrived, waiting up to timeout seconds for something,
+        and return the snapshots it completes.
+        """
+        self.socket.settimeout(timeout)
+        try:
+            data = self.socket.recv(1 << 16)
+        except (BlockingIOError, socket.timeout):
+            return []
+        if not data:
+            raise ConnectionError("The game stopped streaming.")
+        self.bytes_received += len(data)
+        self.buffer += data
+
+        snapshots = []
+        while len(self.buffer) >= MESSAGE.size:
+            kind, length = MESSAGE.unpack_from(self.buffer)
+            if len(self.buffer) < MESSAGE.size + length:
+                break
+            payload = bytes(self.buffer[MESSAGE.size:MESSAGE.size + length])
+            del self.buffer[:MESSAGE.size + length]
+
+            if kind == HELLO:
+                width, height, self.tick_rate = HELLO_BODY.unpack(payload)
+                self.screen_size = (width, height)
+                continue
+            start = perf_counter()
+            state = zlib.decompress(payload)
+            if kind == DELTA:
+                state = xor_bytes(state, self.previous)
+            self.previous = state
+            snapshots.append(Snapshot(state))
+            self.decode_time += perf_counter() - start
+        self.snapshots += len(snapshots)
+        return snapshots
+
+    def stats(self):
+        """Return bandwidth and decoding time per snapshot as a dictionary."""
+        snapshots = self.snapshots or 1
+        return {
+            'snapshots': self.snapshots,
+            'bytes_per_snapshot': self.bytes_received / snapshots,
+            'decode_ms': self.decode_time / snapshots * 1000,
+        }
+
+    def close(self):
+        """Disconnect from the server."""
+        self.socket.close()
+
+
+def watch(host, port):
+    """Open a window and draw the game streamed from host:port."""
+    import pygame
+    from assets import AssetRegistry
+
+    client = SpectatorClient(host, port)
+    while client.screen_size is None:
+        client.receive(timeout=5)
+
+    pygame.init()
+    screen = pygame.display.set_mode(client.screen_size)
+    pygame.display.set_caption(f"Alien Invasion - watching {host}:{port}")
+    assets = AssetRegistry()
+    alien, bullet, ship, heart = (assets.image(key) for key in ('alien', 'bullet', 'ship', 'heart'))
+    font = pygame.font.SysFont(None, 48)
+    bg_color = (211, 211, 211)
+    clock = pygame.time.Clock()
+
+    snapshot = None
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                client.close()
+                print(client.stats())
+                return
+
+        snapshots = client.receive(timeout=0)
+        if snapshots:
+            snapshot = snapshots[-1]
+        if snapshot is not None:
+            screen.fill(bg_color)
+            screen.blits([(alien, position) for position in snapshot.aliens], doreturn=False)
+            screen.blits([(bullet, position) for position in snapshot.bullets], doreturn=False)
+            if snapshot.ship_visible and not snapshot.respawning:
+                screen.blit(ship, (snapshot.ship_x, client.screen_size[1] - ship.get_height()))
+            for number in range(snapshot.ships_left):
+                screen.blit(heart, (10 + number * heart.get_width(), 10))
+            text = font.render(f"Score: {round(snapshot.score, -1):,}   Level: {snapshot.level}",
+                               True, (250, 0, 0))
+            screen.blit(text, text.get_rect(topright=(client.screen_size[0] - 20, 20)))
+            pygame.display.flip()
+        clock.tick(60)
+
+
+def self_test(ticks=600):
+    """Stream a headless game to a client on localhost and check every snapshot."""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    from settings import Settings
+    from game_core import GameCore, TickInput
+
+    core = GameCore(Settings())
+    core.start_game(7)
+    server = SpectatorServer(core.settings, 0)
+    client = SpectatorClient('127.0.0.1', server.port)
+
+    received = []
+    expected = []
+    for tick in range(ticks):
+        right = (tick // 90) % 2 == 0
+        core.step(TickInput(move_left=not right, move_right=right, fire=tick % 8 == 0))
+        server.broadcast(core)
+        expected.append(encode_state(core))
+        received += client.receive(timeout=0)
+    while len(received) < len(expected):
+        received += client.receive(timeout=2)
+
+    mismatches = sum(1 for snapshot, state in zip(received, expected)
+                     if vars(snapshot) != vars(Snapshot(state)))
+    server_stats = server.stats()
+    client_stats = client.stats()
+    client.close()
+    server.close()
+
+    print(f"{len(received)} snapshots, {server_stats['bytes_per_tick']:.0f} bytes/tick"
+          f" (keyframe {len(expected[-1])} bytes raw),"
+          f" encode {server_stats['encode_ms']:.3f} ms, decode {client_stats['decode_ms']:.3f} ms.")
+    if mismatches:
+        sys.exit(f"{mismatches} snapshots differ from what was sent.")
+    print("Every snapshot matches the game.")
+
+
+if __name__ == '__main__':
+    if sys.argv[1:] == ['--self-test']:
+        self_test()
+    elif len(sys.argv) == 3:
+        watch(sys.argv[1], int(sys.argv[2]))
+    else:
+        sys.exit("usage: python spectator.py HOST PORT | --self-test")
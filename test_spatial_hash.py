@@ -0,0 +1,127 @@
+from random import Random
+from types import SimpleNamespace
+
+import pygame
+import pytest
+
+from fleet import Fleet, numpy_available
+from spatial_hash import SpatialHash, _random_groups
+
+SIZE = (1200, 800)
+
+
+def _collision_rects(collisions):
+    """Return groupcollide-style results as sorted rect tuples, to compare."""
+    return sorted((tuple(bullet.rect), [tuple(alien.rect) for alien in hits])
+                  for bullet, hits in collisions.items())
+
+
+def _bucketed_then_moved(rng, aliens, cell_size=64):
+    """
+    Bucket the aliens somewhere else, then move them into place the way the
+    fleet moves: sideways a fraction of a pixel at a time, and down in drops.
+    """
+    moves = [(rng.uniform(-3, 3), 0) for _ in range(rng.randrange(1, 100))]
+    moves += [(0, 10)] * rng.randrange(0, 10)
+    rng.shuffle(moves)
+    dx = sum(move[0] for move in moves)
+    dy = sum(move[1] for move in moves)
+
+    for alien in aliens:
+        alien.rect.move_ip(-round(dx), -dy)
+    grid = SpatialHash(cell_size)
+    grid.rebuild(aliens.sprites())
+    for alien in aliens:
+        alien.rect.move_ip(round(dx), dy)
+    for move in moves:
+        grid.move(*move)
+    return grid
+
+
+@pytest.mark.parametrize('seed', range(50))
+def test_grid_matches_groupcollide(seed):
+    rng = Random(seed)
+    state = rng.getstate()
+    expected = pygame.sprite.groupcollide(*_random_groups(rng, SIZE), True, True)
+    rng.setstate(state)
+    bullets, aliens = _random_groups(rng, SIZE)
+
+    grid = _bucketed_then_moved(rng, aliens)
+    actual = grid.groupcollide(bullets, aliens)
+
+    assert _collision_rects(actual) == _collision_rects(expected)
+
+
+@pytest.mark.parametrize('cell_size', [16, 52, 64, 200])
+def test_cell_size_does_not_change_collisions(cell_size):
+    rng = Random(cell_size)
+    state = rng.getstate()
+    expected = pygame.sprite.groupcollide(*_random_groups(rng, SIZE), True, True)
+    rng.setstate(state)
+    bullets, aliens = _random_groups(rng, SIZE)
+
+    grid = _bucketed_then_moved(rng, aliens, cell_size)
+    actual = grid.groupcollide(bullets, aliens)
+
+    assert _collision_rects(actual) == _collision_rects(expected)
+
+
+def test_query_skips_killed_sprites():
+    aliens = pygame.sprite.Group()
+    for x in (0, 30, 60):
+        alien = pygame.sprite.Sprite()
+        alien.rect = pygame.Rect(x, 0, 52, 52)
+        aliens.add(alien)
+    grid = SpatialHash()
+    grid.rebuild(aliens.sprites())
+    first, second, third = aliens.sprites()
+    second.kill()
+
+    assert grid.query(pygame.Rect(50, 10, 12, 5)) == [first, third]
+
+
+def _fleet_settings():
+    """Return just enough settings for a Fleet to move."""
+    return SimpleNamespace(alien_speed=60.0, wave_speed=1.0, fleet_direction=1,
+                           fleet_drop_speed=10)
+
+
+def _random_fleet(rng):
+    """Build an array fleet of randomly placed aliens, some of them dead."""
+    fleet = Fleet(SimpleNamespace(settings=_fleet_settings()))
+    aliens = []
+    for _ in range(200):
+        alien = pygame.sprite.Sprite()
+        alien.x = rng.uniform(0, SIZE[0])
+        alien.rect = pygame.Rect(round(alien.x), rng.randrange(SIZE[1]), 52, 52)
+        aliens.append(alien)
+    fleet.add_many(aliens, [alien.x for alien in aliens], [alien.rect.y for alien in aliens])
+    for alien in rng.sample(aliens, 20):
+        fleet.kill(alien)
+    return fleet
+
+
+@pytest.mark.skipif(not numpy_available(), reason="NumPy is not installed.")
+@pytest.mark.parametrize('seed', range(20))
+def test_fleet_grid_matches_full_scan(seed):
+    rng = Random(seed)
+    fleet = _random_fleet(rng)
+    fleet.rebuild_grid(64)
+
+    # Move and drop the fleet after bucketing it.
+    for _ in range(rng.randrange(1, 60)):
+        fleet.settings.fleet_direction = rng.choice((1, -1))
+        fleet.update(rng.uniform(0, 0.05))
+        if rng.random() < 0.1:
+            fleet.drop()
+
+    bullets = [pygame.Rect(rng.randrange(SIZE[0]), rng.randrange(SIZE[1]), 13, 29)
+               for _ in range(100)]
+    with_grid = fleet.collide_rects(bullets)
+    cells = fleet.cells
+    fleet.cells = None
+    full_scan = fleet.collide_rects(bullets)
+    fleet.cells = cells
+
+    assert with_grid == full_scan
+    assert any(with_grid)
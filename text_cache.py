@@ -0,0 +1,69 @@
+import pygame
+
+# Fonts already loaded, keyed by (name, size).
+_fonts = {}
+
+
+def get_font(name=None, size=48):
+    """Return a shared SysFont, loading it only the first time it's asked for."""
+    font = _fonts.get((name, size))
+    if font is None:
+        font = _fonts[(name, size)] = pygame.font.SysFont(name, size)
+    return font
+
+
+class GlyphAtlas:
+    """Characters of one font and color rendered once, for building text from blits."""
+
+    def __init__(self, font, color, bg_color, chars="0123456789,-"):
+        """Render every character in chars."""
+        self.font = font
+        self.color = color
+        self.bg_color = bg_color
+        self.glyphs = {char: font.render(char, True, color, bg_color) for char in chars}
+        self.height = max(glyph.get_height() for glyph in self.glyphs.values())
+
+    def render_label(self, text):
+        """Render fixed text, like a label, with the atlas's font and colors."""
+        return self.font.render(text, True, self.color, self.bg_color)
+
+
+class NumberText:
+    """
+    A fixed label followed by a number, built from pre-rendered glyphs.
+
+    The image is only rebuilt when the number's text changes, and then
+    only takes one blit per character into a reused buffer.
+    """
+
+    def __init__(self, atlas, label):
+        """Render the label once."""
+        self.atlas = atlas
+        self.label_image = atlas.render_label(label)
+        self.height = max(self.label_image.get_height(), atlas.height)
+        self.text = None
+        self.buffer = None
+        self.image = None
+
+    def set_text(self, text):
+        """Show text after the label; return True if the image changed."""
+        if text == self.text:
+            return False
+        self.text = text
+
+        glyphs = [self.atlas.glyphs[char] for char in text]
+        width = self.label_image.get_width() + sum(glyph.get_width() for glyph in glyphs)
+
+        # Grow the buffer only when the text gets wider than it has been.
+        if self.buffer is None or self.buffer.get_width() < width:
+            self.buffer = pygame.Surface((width + 4 * self.height, self.height))
+        self.image = self.buffer.subsurface((0, 0, width, self.height))
+
+        self.image.fill(self.atlas.bg_color)
+        x = self.label_image.get_width()
+        blits = [(self.label_image, (0, 0))]
+        for glyph in glyphs:
+            blits.append((glyph, (x, 0)))
+            x += glyph.get_width()
+        self.image.blits(blits, doreturn=False)
+        return True
@@ -0,0 +1,138 @@
+import json
+
+from assets import asset_path
+
+FORMATIONS = ('classic', 'grid', 'v', 'diamond')
+
+# Wave files already read, keyed by path, and layouts already compiled,
+# keyed by wave, screen size and alien size.
+_books = {}
+_layouts = {}
+
+
+class Wave:
+    """One wave of aliens, as described in the wave file."""
+
+    def __init__(self, data):
+        """Read a wave's description."""
+        self.name = data['name']
+        self.formation = data['formation']
+        if self.formation not in FORMATIONS:
+            raise ValueError(f"Wave {self.name!r} has unknown formation {self.formation!r}.")
+
+        # density 1 packs aliens edge to edge; spacing, if given, is the
+        # distance between aliens in pixels instead.
+        self.density = data.get('density', 1.0)
+        self.spacing = data.get('spacing')
+
+        # Alien speed and points for the wave, as multiples of the level's.
+        self.speed = data.get('speed', 1.0)
+        self.points = data.get('points', 1.0)
+
+
+class WaveBook:
+    """The waves of a wave file, and the layouts compiled from them."""
+
+    def __init__(self, path):
+        """Read the wave file at path."""
+        with open(path) as file:
+            data = json.load(file)
+        self.waves = [Wave(wave) for wave in data['waves']]
+        self.extra = [Wave(wave) for wave in data.get('extra', [])]
+
+        # After the last wave, play on from the wave at this index.
+        self.loop_from = data.get('loop_from', 0)
+
+    def wave_for(self, level, name=None):
+        """Return the wave for a level, or the wave called name if given."""
+        if name is not None:
+            return self.named(name)
+        index = level - 1
+        if index >= len(self.waves):
+            loop = len(self.waves) - self.loop_from
+            index = self.loop_from + (index - self.loop_from) % loop
+        return self.waves[index]
+
+    def named(self, name):
+        """Return the wave called name."""
+        for wave in self.waves + self.extra:
+            if wave.name == name:
+                return wave
+        raise KeyError(f"No wave called {name!r}.")
+
+    def layout(self, wave, screen_size, alien_size):
+        """Return a wave's alien positions as (xs, ys), compiling them only once."""
+        key = (wave.name, wave.formation, wave.density, wave.spacing, screen_size, alien_size)
+        layout = _layouts.get(key)
+        if layout is None:
+            layout = _layouts[key] = compile_layout(wave, screen_size, alien_size)
+        return layout
+
+
+def load_waves(path):
+    """Return the WaveBook for a wave file, reading it only the first time."""
+    book = _books.get(path)
+    if book is None:
+        book = _books[path] = WaveBook(asset_path(path))
+    return book
+
+
+def compile_layout(wave, screen_size, alien_size):
+    """Work out where every alien of a fixed formation goes."""
+    screen_width, screen_height = screen_size
+    alien_width, alien_height = alien_size
+    if wave.spacing:
+        step_x = step_y = wave.spacing
+    else:
+        step_x = max(1, round(alien_width * (2 - wave.density)))
+        step_y = max(1, round(alien_height * (2 - wave.density)))
+
+    # The same area the classic fleet fills.
+    columns = range(alien_width, screen_width - 2 * alien_width, step_x)
+    rows = range(alien_height, screen_height - 8 * alien_height, step_y)
+    if not columns or not rows:
+        return [], []
+
+    # u runs -1 to 1 across the formation, v runs 0 to 1 down it.
+    center = (columns[0] + columns[-1]) / 2
+    half_width = max(1, (columns[-1] - columns[0]) / 2)
+    height = max(1, rows[-1] - rows[0])
+
+    xs, ys = [], []
+    for y in rows:
+        v = (y - rows[0]) / height
+        for x in columns:
+            u = (x - center) / half_width
+            if wave.formation == 'v':
+                # Two arms from the top corners down to the middle.
+                keep = abs(abs(u) - (1 - v)) <= 0.25
+            elif wave.formation == 'diamond':
+                keep = abs(u) + abs(2 * v - 1) <= 1
+            else:
+                keep = True
+            if keep:
+                xs.append(float(x))
+                ys.append(y)
+    return xs, ys
+
+
+if __name__ == '__main__':
+    # Compile every wave for the default screen and report how long it took.
+    from time import perf_counter
+    from settings import Settings
+
+    settings = Settings()
+    book = load_waves(settings.wave_file)
+    size = (settings.screen_width, settings.screen_height)
+    for wave in book.waves + book.extra:
+        if wave.formation == 'classic':
+            print(f"{wave.name}: random classic fleet, built per game")
+            continue
+        start = perf_counter()
+        xs, _ = book.layout(wave, size, (52, 52))
+        compiled = perf_counter() - start
+        start = perf_counter()
+        book.layout(wave, size, (52, 52))
+        cached = perf_counter() - start
+        print(f"{wave.name}: {len(xs):,} aliens, compiled in {compiled * 1000:.2f} ms,"
+              f" cached in {cached * 1000:.4f} ms")